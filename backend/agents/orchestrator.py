@@ -3,18 +3,43 @@ Compass multi-agent orchestrator powered by Amazon Nova 2 Lite.
 Manages the full agentic loop: conversation → eligibility → resources → action plan.
 """
 
-import json
+import asyncio
 import logging
 import re
+import time
 import uuid
+import weakref
+from collections import OrderedDict
 from collections.abc import AsyncGenerator
 from typing import Any, Optional
 
+import orjson
+
+from backend.config import (
+    NOVA_LITE_MAX_HISTORY_TURNS,
+    SESSION_CACHE_SIZE,
+    SESSION_TTL_SECONDS,
+    STREAM_N,
+    TOOL_MAX_CONCURRENCY,
+)
 from backend.database import SessionStore
 from backend.services.nova_lite import NovaLiteService
+from backend.tools.document_tool import analyze_document
+from backend.tools.eligibility import check_benefit_eligibility
+from backend.tools.resources import find_local_resources
 
 logger = logging.getLogger(__name__)
 
+# Nova's chain-of-thought blocks, stripped from every final response
+_THINKING_RE = re.compile(r"<thinking>.*?</thinking>", re.DOTALL)
+
+# Document-analysis confidence levels trusted to update the user profile
+_PROFILE_UPDATE_CONFIDENCE = frozenset({"high", "medium"})
+
+# SSE framing for chat_stream. Deltas only JSON-encode the text itself.
+_SSE_DELTA_PREFIX = b'data: {"delta": '
+_SSE_DELTA_SUFFIX = b"}\n\n"
+
 COMPASS_SYSTEM_PROMPT = """You are Compass, a compassionate and knowledgeable AI assistant helping people in need navigate government benefits and social services in the United States.
 
 Your mission is to help people discover benefits they are entitled to but may not know about. Every year, $30 billion in government benefits go unclaimed because the systems are too complex, confusing, or inaccessible.
@@ -197,6 +222,13 @@ TOOL_DEFINITIONS = [
     },
 ]
 
+# Bedrock toolConfig, built once and reused for every model turn
+TOOL_CONFIG = {"tools": TOOL_DEFINITIONS}
+
+
+def _sse_delta(text: str) -> bytes:
+    return _SSE_DELTA_PREFIX + orjson.dumps(text) + _SSE_DELTA_SUFFIX
+
 
 class CompassOrchestrator:
     """
@@ -206,16 +238,34 @@ class CompassOrchestrator:
 
     def __init__(self, store: Optional[SessionStore] = None):
         self.nova_lite = NovaLiteService()
-        self._sessions: dict[str, dict] = {}
+        # In-memory fallback when no store is configured: session_id → (last access, session),
+        # least recently used first. Bounded by SESSION_CACHE_SIZE and SESSION_TTL_SECONDS.
+        self._sessions: OrderedDict[str, tuple[float, dict]] = OrderedDict()
         self.store = store
+        # Bounds concurrent tool executions (some tools call Bedrock themselves)
+        self._tool_semaphore = asyncio.Semaphore(TOOL_MAX_CONCURRENCY)
+        # One turn at a time per session: turns edit the shared history in place.
+        # Weak values, so a session's lock goes away once no turn holds it.
+        self._turn_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self._dispatch = {
+            "check_benefit_eligibility": self._tool_eligibility,
+            "find_local_resources": self._tool_resources,
+            "analyze_document": self._tool_document,
+            "create_action_plan": self._tool_plan,
+        }
 
     async def get_or_create_session(self, session_id: str) -> dict:
         """Get existing session or create a new one (delegates to SessionStore when available)."""
         if self.store:
+            # Common case: the session is already cached — skip the store's coroutine
+            session = self.store.get_cached(session_id)
+            if session is not None:
+                return session
             return await self.store.get_or_create_session(session_id)
         # In-memory fallback (no store configured)
-        if session_id not in self._sessions:
-            self._sessions[session_id] = {
+        session = self._touch_session(session_id)
+        if session is None:
+            session = {
                 "session_id": session_id,
                 "messages": [],
                 "eligible_programs": [],
@@ -224,7 +274,40 @@ class CompassOrchestrator:
                 "document_analysis": None,
                 "user_profile": {},
             }
-        return self._sessions[session_id]
+            now = time.monotonic()
+            self._drop_expired_sessions(now)
+            self._sessions[session_id] = (now, session)
+            while len(self._sessions) > SESSION_CACHE_SIZE:
+                self._sessions.popitem(last=False)
+        return session
+
+    def _drop_expired_sessions(self, now: float) -> None:
+        """Evict expired in-memory sessions; least recently used first, so they sit at the front."""
+        while self._sessions:
+            session_id, (last_access, _) = next(iter(self._sessions.items()))
+            if now - last_access <= SESSION_TTL_SECONDS:
+                break
+            del self._sessions[session_id]
+
+    def _touch_session(self, session_id: str) -> Optional[dict]:
+        """Return a live in-memory session and mark it most recently used; drop it if expired."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if now - entry[0] > SESSION_TTL_SECONDS:
+            del self._sessions[session_id]
+            return None
+        self._sessions[session_id] = (now, entry[1])
+        self._sessions.move_to_end(session_id)
+        return entry[1]
+
+    def _turn_lock(self, session_id: str) -> asyncio.Lock:
+        """The lock serializing turns on one session (a double-submit, or chat and chat_stream at once)."""
+        lock = self._turn_locks.get(session_id)
+        if lock is None:
+            lock = self._turn_locks[session_id] = asyncio.Lock()
+        return lock
 
     async def chat(
         self,
@@ -244,136 +327,137 @@ class CompassOrchestrator:
         Returns:
             dict with 'response', 'tool_calls_made', 'session_data'
         """
-        session = await self.get_or_create_session(session_id)
-
-        # Build user message content
-        content: list[dict] = []
-        if document_base64:
-            # Attach image to the message
-            content.append({
-                "image": {
-                    "format": "jpeg",
-                    "source": {"bytes": document_base64},
-                }
-            })
-            content.append({"text": user_message or "I've uploaded a document. Can you analyze it?"})
-        else:
-            content.append({"text": user_message})
-
-        session["messages"].append({"role": "user", "content": content})
+        async with self._turn_lock(session_id):
+            session = await self.get_or_create_session(session_id)
+
+            # Build user message content
+            content: list[dict] = []
+            if document_base64:
+                # Attach image to the message
+                content.append({
+                    "image": {
+                        "format": "jpeg",
+                        "source": {"bytes": document_base64},
+                    }
+                })
+                content.append({"text": user_message or "I've uploaded a document. Can you analyze it?"})
+            else:
+                content.append({"text": user_message})
 
-        # Run the agentic loop
-        response_text, tool_calls_made = await self._run_agent_loop(session)
+            session["messages"].append({"role": "user", "content": content})
 
-        # Add assistant message to history
-        session["messages"].append({
-            "role": "assistant",
-            "content": [{"text": response_text}],
-        })
+            # Run the agentic loop
+            response_text, tool_calls_made = await self._run_agent_loop(session)
 
-        if self.store:
-            await self.store.save_session(session)
-
-        return {
-            "response": response_text,
-            "tool_calls_made": tool_calls_made,
-            "session_data": {
-                "eligible_programs": session.get("eligible_programs", []),
-                "local_resources": session.get("local_resources", []),
-                "action_plan": session.get("action_plan"),
-                "document_analysis": session.get("document_analysis"),
-                "has_results": bool(session.get("eligible_programs")),
-            },
-        }
+            return {
+                "response": response_text,
+                "tool_calls_made": tool_calls_made,
+                "session_data": await self._finalize_turn(session, response_text),
+            }
 
     async def chat_stream(
         self,
         session_id: str,
         user_message: str,
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
         Process a user message and stream Nova Lite's response as SSE events.
         Tool calls run silently between stream turns; the final text response
         is streamed token-by-token using Bedrock's converse_stream API.
 
-        Yields SSE strings: 'data: {...}\\n\\n'
+        Yields UTF-8 encoded SSE frames: b'data: {...}\\n\\n'
         Final event: 'data: {"done": true, "tool_calls": [...], "session_data": {...}}\\n\\n'
         """
-        session = await self.get_or_create_session(session_id)
-        session["messages"].append({"role": "user", "content": [{"text": user_message}]})
-        messages = list(session["messages"])
-        tool_calls_made: list[dict] = []
-        full_response_text = ""
-
-        for _ in range(10):
-            done_payload: Optional[dict] = None
-            iteration_text: list[str] = []
-
-            # Use real Bedrock streaming for every turn
-            for event_type, payload in self.nova_lite.converse_stream(
-                messages=messages,
-                system_prompt=COMPASS_SYSTEM_PROMPT,
-                tools=TOOL_DEFINITIONS,
-            ):
-                if event_type == "text":
-                    iteration_text.append(payload)
-                    # Yield text deltas immediately to the client.
-                    # Tool-use turns rarely emit text; end_turn turns emit the full answer.
-                    yield f"data: {json.dumps({'delta': payload})}\n\n"
-                elif event_type == "done":
-                    done_payload = payload
-
-            if not done_payload:
-                break
-
-            stop_reason = done_payload["stop_reason"]
-
-            if stop_reason == "end_turn":
-                raw_text = "".join(iteration_text)
-                full_response_text = re.sub(
-                    r"<thinking>.*?</thinking>", "", raw_text, flags=re.DOTALL
-                ).strip()
-                break
+        async with self._turn_lock(session_id):
+            session = await self.get_or_create_session(session_id)
+            session["messages"].append({"role": "user", "content": [{"text": user_message}]})
+            # Tool turns are appended in place and trimmed off again below, so only
+            # the user message and the final answer stay in the session history.
+            messages = session["messages"]
+            baseline_len = len(messages)
+            history_start = _history_window_start(messages)
+            tool_calls_made: list[dict] = []
+            full_response_text = ""
+            # Deltas are coalesced STREAM_N at a time; the first one goes out alone to keep TTFT low
+            pending: list[str] = []
+            first_delta_sent = False
+
+            try:
+                for _ in range(10):
+                    done_payload: Optional[dict] = None
+                    iteration_text: list[str] = []
+
+                    # Use real Bedrock streaming for every turn
+                    for event_type, payload in self.nova_lite.converse_stream(
+                        messages=messages[history_start:],
+                        system_prompt=COMPASS_SYSTEM_PROMPT,
+                        tool_config=TOOL_CONFIG,
+                    ):
+                        if event_type == "text":
+                            iteration_text.append(payload)
+                            # Tool-use turns rarely emit text; end_turn turns emit the full answer.
+                            pending.append(payload)
+                            if not first_delta_sent or len(pending) >= STREAM_N:
+                                yield _sse_delta("".join(pending))
+                                pending.clear()
+                                first_delta_sent = True
+                        elif event_type == "done":
+                            done_payload = payload
+
+                    if pending:
+                        yield _sse_delta("".join(pending))
+                        pending.clear()
+
+                    if not done_payload:
+                        break
+
+                    stop_reason = done_payload["stop_reason"]
+
+                    if stop_reason == "end_turn":
+                        raw_text = "".join(iteration_text)
+                        full_response_text = _THINKING_RE.sub("", raw_text).strip()
+                        break
+
+                    elif stop_reason == "tool_use":
+                        # Append model message and execute tools silently
+                        messages.append(done_payload["raw_message"])
+                        tool_results = await self._execute_tool_calls(
+                            session, done_payload["tool_calls"], tool_calls_made
+                        )
+                        messages.append({"role": "user", "content": tool_results})
+                    else:
+                        break
+            finally:
+                del messages[baseline_len:]
+
+            # Send final SSE event with session metadata and clean response text
+            final_event = {
+                "done": True,
+                "response": full_response_text,
+                "tool_calls": tool_calls_made,
+                "session_id": session["session_id"],
+                "session_data": await self._finalize_turn(session, full_response_text),
+            }
+            yield b"data: " + orjson.dumps(final_event) + b"\n\n"
 
-            elif stop_reason == "tool_use":
-                # Append model message and execute tools silently
-                messages.append(done_payload["raw_message"])
-                tool_results = []
-                for tc in done_payload["tool_calls"]:
-                    tool_calls_made.append({"name": tc["name"], "input": tc["input"]})
-                    try:
-                        output = await self._execute_tool(session, tc["name"], tc["input"])
-                    except Exception as e:
-                        logger.error("Tool %s failed: %s", tc["name"], e)
-                        output = {"error": str(e)}
-                    tool_results.append({
-                        "toolResult": {
-                            "toolUseId": tc["tool_use_id"],
-                            "content": [{"json": output}],
-                        }
-                    })
-                messages.append({"role": "user", "content": tool_results})
-            else:
-                break
+    async def _finalize_turn(self, session: dict, response_text: str) -> dict:
+        """
+        Record the assistant's answer, persist the session once, and return
+        the session_data summary sent back to the client.
 
-        # Store final assistant message in session
+        save_session only caches the session and snapshots its messages; the
+        SQLite write happens in the store's next flush. It runs here, while the
+        turn lock is held, so the saved messages are exactly this turn's.
+        """
         session["messages"].append({
             "role": "assistant",
-            "content": [{"text": full_response_text}],
+            "content": [{"text": response_text}],
         })
 
         if self.store:
             await self.store.save_session(session)
 
-        # Send final SSE event with session metadata and clean response text
-        session_data = {
-            "eligible_programs": session.get("eligible_programs", []),
-            "local_resources": session.get("local_resources", []),
-            "action_plan": session.get("action_plan"),
-            "document_analysis": session.get("document_analysis"),
-            "has_results": bool(session.get("eligible_programs")),
-        }
-        yield f"data: {json.dumps({'done': True, 'response': full_response_text, 'tool_calls': tool_calls_made, 'session_id': session['session_id'], 'session_data': session_data})}\n\n"
+        return _snapshot_session(session)
 
     async def _run_agent_loop(self, session: dict) -> tuple[str, list]:
         """
@@ -383,113 +467,135 @@ class CompassOrchestrator:
         Returns:
             (final_response_text, list_of_tool_calls_made)
         """
-        messages = list(session["messages"])  # copy to avoid mutation during loop
+        # Work on the history in place; the intermediate tool turns are removed
+        # again on exit (including on errors) instead of copying the whole list.
+        messages = session["messages"]
+        baseline_len = len(messages)
+        history_start = _history_window_start(messages)
         tool_calls_made = []
 
-        for _ in range(10):  # max 10 iterations to prevent infinite loops
-            result = self.nova_lite.converse(
-                messages=messages,
-                system_prompt=COMPASS_SYSTEM_PROMPT,
-                tools=TOOL_DEFINITIONS,
-            )
-
-            if result["stop_reason"] == "end_turn":
-                clean_text = re.sub(r'<thinking>.*?</thinking>', '', result["text"], flags=re.DOTALL).strip()
-                return clean_text, tool_calls_made
-
-            if result["stop_reason"] == "tool_use":
-                # Add model's message (with tool_use blocks) to conversation
-                messages.append(result["raw_message"])
-
-                # Execute each tool call
-                tool_results = []
-                for tool_call in result["tool_calls"]:
-                    tool_name = tool_call["name"]
-                    tool_input = tool_call["input"]
-                    tool_use_id = tool_call["tool_use_id"]
-
-                    logger.info("Executing tool: %s", tool_name)
-                    tool_calls_made.append({"name": tool_name, "input": tool_input})
-
-                    try:
-                        tool_output = await self._execute_tool(session, tool_name, tool_input)
-                    except Exception as e:
-                        logger.error("Tool %s failed: %s", tool_name, e)
-                        tool_output = {"error": str(e)}
-
-                    tool_results.append({
-                        "toolResult": {
-                            "toolUseId": tool_use_id,
-                            "content": [{"json": tool_output}],
-                        }
-                    })
-
-                # Add tool results to conversation
-                messages.append({"role": "user", "content": tool_results})
+        try:
+            for _ in range(10):  # max 10 iterations to prevent infinite loops
+                result = await self.nova_lite.aconverse(
+                    messages=messages[history_start:],
+                    system_prompt=COMPASS_SYSTEM_PROMPT,
+                    tool_config=TOOL_CONFIG,
+                )
+
+                if result["stop_reason"] == "end_turn":
+                    clean_text = _THINKING_RE.sub("", result["text"]).strip()
+                    return clean_text, tool_calls_made
+
+                if result["stop_reason"] == "tool_use":
+                    # Add model's message (with tool_use blocks) to conversation
+                    messages.append(result["raw_message"])
+
+                    # Execute all tool calls from this turn concurrently
+                    tool_results = await self._execute_tool_calls(
+                        session, result["tool_calls"], tool_calls_made
+                    )
+
+                    # Add tool results to conversation
+                    messages.append({"role": "user", "content": tool_results})
 
+                else:
+                    # Unexpected stop reason
+                    logger.warning("Unexpected stop reason: %s", result["stop_reason"])
+                    return result.get("text", "I encountered an issue. Please try again."), tool_calls_made
+
+            return "I've gathered information about your situation. Please review the results.", tool_calls_made
+        finally:
+            del messages[baseline_len:]
+
+    async def _execute_tool_calls(
+        self,
+        session: dict,
+        tool_calls: list[dict],
+        tool_calls_made: list[dict],
+    ) -> list[dict]:
+        """
+        Run every tool call from one model turn concurrently.
+
+        The tools are independent of each other, so the turn takes as long as
+        the slowest call rather than the sum of all of them. Their session
+        updates are applied afterwards in call order, so when two calls touch
+        the same field (both eligibility and document analysis set the
+        income) the later call wins regardless of which finished first.
+        Results are returned as Bedrock toolResult blocks in the original call
+        order; a failing tool is reported back to the model as {"error": ...}.
+        """
+        for tc in tool_calls:
+            logger.info("Executing tool: %s", tc["name"])
+            tool_calls_made.append({"name": tc["name"], "input": tc["input"]})
+
+        outputs = await asyncio.gather(
+            *(self._execute_tool_bounded(tc["name"], tc["input"]) for tc in tool_calls),
+            return_exceptions=True,
+        )
+
+        tool_results = []
+        for tc, output in zip(tool_calls, outputs):
+            if isinstance(output, Exception):
+                logger.error("Tool %s failed: %s", tc["name"], output)
+                output = {"error": str(output)}
             else:
-                # Unexpected stop reason
-                logger.warning("Unexpected stop reason: %s", result["stop_reason"])
-                return result.get("text", "I encountered an issue. Please try again."), tool_calls_made
-
-        return "I've gathered information about your situation. Please review the results.", tool_calls_made
-
-    async def _execute_tool(self, session: dict, tool_name: str, tool_input: dict) -> Any:
-        """Execute a tool and store results in session."""
-        if tool_name == "check_benefit_eligibility":
-            from backend.tools.eligibility import check_benefit_eligibility
-            result = check_benefit_eligibility(**tool_input)
-            session["eligible_programs"] = result.get("eligible_programs", [])
-            session["user_profile"].update({
-                "annual_income": tool_input.get("annual_income"),
-                "household_size": tool_input.get("household_size"),
-                "state": tool_input.get("state"),
+                _record_tool_result(session, tc["name"], tc["input"], output)
+            tool_results.append({
+                "toolResult": {
+                    "toolUseId": tc["tool_use_id"],
+                    "content": [{"json": output}],
+                }
             })
-            return result
-
-        elif tool_name == "find_local_resources":
-            from backend.tools.resources import find_local_resources
-            result = find_local_resources(**tool_input)
-            session["local_resources"] = result.get("resources", [])
-            return result
-
-        elif tool_name == "analyze_document":
-            from backend.tools.document_tool import analyze_document
-            from backend.services.nova_lite import NovaLiteService
-            result = analyze_document(
-                image_base64=tool_input["image_base64"],
-                document_type=tool_input.get("document_type", "unknown"),
-                nova_lite_client=self.nova_lite,
-            )
-            session["document_analysis"] = result
-
-            # Auto-update user profile from document if confidence is high
-            if result.get("confidence") in ("high", "medium"):
-                fields = result.get("key_fields", {})
-                if result.get("annual_income_estimate"):
-                    session["user_profile"]["annual_income"] = result["annual_income_estimate"]
-                if fields.get("address"):
-                    session["user_profile"]["address"] = fields["address"]
-
-            return result
-
-        elif tool_name == "create_action_plan":
-            result = _build_action_plan(
-                eligible_programs=tool_input.get("eligible_programs", []),
-                local_resources=tool_input.get("local_resources", []),
-                user_situation=tool_input.get("user_situation", ""),
-                language=tool_input.get("language", "en"),
-            )
-            session["action_plan"] = result
-            return result
-
-        else:
+        return tool_results
+
+    async def _execute_tool_bounded(self, tool_name: str, tool_input: dict) -> Any:
+        async with self._tool_semaphore:
+            return await self._execute_tool(tool_name, tool_input)
+
+    async def _execute_tool(self, tool_name: str, tool_input: dict) -> Any:
+        """
+        Execute a tool and return its result.
+
+        The tool functions are synchronous, so they run in a worker thread.
+        Nothing here touches the session; see _record_tool_result.
+        """
+        handler = self._dispatch.get(tool_name)
+        if handler is None:
             return {"error": f"Unknown tool: {tool_name}"}
+        return await handler(tool_input)
+
+    # Tool handlers — each runs one tool and returns its result
+
+    async def _tool_eligibility(self, tool_input: dict) -> Any:
+        return await asyncio.to_thread(check_benefit_eligibility, **tool_input)
+
+    async def _tool_resources(self, tool_input: dict) -> Any:
+        return await asyncio.to_thread(find_local_resources, **tool_input)
+
+    async def _tool_document(self, tool_input: dict) -> Any:
+        # Blocking Bedrock vision call — keep it off the event loop
+        return await asyncio.to_thread(
+            analyze_document,
+            image_base64=tool_input["image_base64"],
+            document_type=tool_input.get("document_type", "unknown"),
+            nova_lite_client=self.nova_lite,
+        )
+
+    async def _tool_plan(self, tool_input: dict) -> Any:
+        return _build_action_plan(
+            eligible_programs=tool_input.get("eligible_programs", []),
+            local_resources=tool_input.get("local_resources", []),
+            user_situation=tool_input.get("user_situation", ""),
+            language=tool_input.get("language", "en"),
+        )
 
     async def get_session(self, session_id: str) -> Optional[dict]:
         if self.store:
+            session = self.store.get_cached(session_id)
+            if session is not None:
+                return session
             return await self.store.get_session(session_id)
-        return self._sessions.get(session_id)
+        return self._touch_session(session_id)
 
     async def clear_session(self, session_id: str) -> None:
         if self.store:
@@ -497,6 +603,108 @@ class CompassOrchestrator:
         self._sessions.pop(session_id, None)
 
 
+# Session updates for each tool's result, applied on the event loop in call order
+
+def _record_eligibility(session: dict, tool_input: dict, result: dict) -> None:
+    session["eligible_programs"] = result.get("eligible_programs", [])
+    session["user_profile"].update({
+        "annual_income": tool_input.get("annual_income"),
+        "household_size": tool_input.get("household_size"),
+        "state": tool_input.get("state"),
+    })
+
+
+def _record_resources(session: dict, tool_input: dict, result: dict) -> None:
+    session["local_resources"] = result.get("resources", [])
+
+
+def _record_document(session: dict, tool_input: dict, result: dict) -> None:
+    session["document_analysis"] = result
+    if "error" not in result:
+        _drop_document_images(
+            session["messages"],
+            result.get("document_type_detected") or tool_input.get("document_type", "unknown"),
+        )
+
+    # Auto-update user profile from document if confidence is high
+    if result.get("confidence") in _PROFILE_UPDATE_CONFIDENCE:
+        fields = result.get("key_fields", {})
+        if result.get("annual_income_estimate"):
+            session["user_profile"]["annual_income"] = result["annual_income_estimate"]
+        if fields.get("address"):
+            session["user_profile"]["address"] = fields["address"]
+
+
+def _record_plan(session: dict, tool_input: dict, result: dict) -> None:
+    session["action_plan"] = result
+
+
+_RECORDERS = {
+    "check_benefit_eligibility": _record_eligibility,
+    "find_local_resources": _record_resources,
+    "analyze_document": _record_document,
+    "create_action_plan": _record_plan,
+}
+
+
+def _record_tool_result(session: dict, tool_name: str, tool_input: dict, result: Any) -> None:
+    recorder = _RECORDERS.get(tool_name)
+    if recorder is not None:
+        recorder(session, tool_input, result)
+
+
+def _snapshot_session(session: dict) -> dict:
+    """The session_data view returned to the client at the end of a turn."""
+    eligible_programs = session.get("eligible_programs", [])
+    return {
+        "eligible_programs": eligible_programs,
+        "local_resources": session.get("local_resources", []),
+        "action_plan": session.get("action_plan"),
+        "document_analysis": session.get("document_analysis"),
+        "has_results": bool(eligible_programs),
+    }
+
+
+def _history_window_start(messages: list[dict]) -> int:
+    """
+    Index of the first message sent to the model: roughly the last
+    NOVA_LITE_MAX_HISTORY_TURNS user/assistant pairs, snapped forward to a
+    plain user message so the window never opens on an assistant reply or an
+    orphaned toolResult.
+    """
+    start = max(0, len(messages) - NOVA_LITE_MAX_HISTORY_TURNS * 2)
+    while start < len(messages) - 1:
+        message = messages[start]
+        if message["role"] == "user" and not any("toolResult" in b for b in message["content"]):
+            break
+        start += 1
+    return start
+
+
+def _drop_document_images(messages: list[dict], document_type: str) -> None:
+    """
+    Replace the most recent uploaded image in the history with a text placeholder.
+
+    Once analyze_document has extracted the fields, the base64 bytes (often
+    hundreds of KB) would otherwise be resent with every later Bedrock call
+    and written out on every session save.
+    """
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        content = message.get("content", [])
+        if any("image" in block for block in content):
+            message["content"] = [
+                {"text": f"[document analyzed: {document_type}]"} if "image" in block else block
+                for block in content
+            ]
+            return
+
+
+# Resource types that warrant an "immediate help" step in the action plan
+_CRISIS_RESOURCE_TYPES = frozenset({"shelter", "crisis_support", "food_bank"})
+
+
 def _build_action_plan(
     eligible_programs: list,
     local_resources: list,
@@ -513,7 +721,7 @@ def _build_action_plan(
     ongoing_steps = []
 
     # Immediate: Crisis resources
-    if any(r.get("type") in ("shelter", "crisis_support", "food_bank") for r in local_resources):
+    if any(r.get("type") in _CRISIS_RESOURCE_TYPES for r in local_resources):
         immediate_steps.append({
             "step": 1,
             "title": "Get Immediate Help",
@@ -570,16 +778,15 @@ def _build_action_plan(
             "urgency": "ongoing",
         })
 
-    all_steps = immediate_steps + short_term_steps + ongoing_steps
-
     return {
         "title": "Your Benefits Action Plan",
         "user_situation_summary": user_situation,
-        "total_steps": len(all_steps),
+        "total_steps": len(immediate_steps) + len(short_term_steps) + len(ongoing_steps),
         "immediate_steps": immediate_steps,
         "short_term_steps": short_term_steps,
         "ongoing_steps": ongoing_steps,
-        "all_steps": all_steps,
+        # The frontend renders the flat list
+        "all_steps": [*immediate_steps, *short_term_steps, *ongoing_steps],
         "reminder": (
             "This plan is a starting point. Eligibility decisions are made by program offices. "
             "Call 2-1-1 anytime for free help navigating these applications."
@@ -1,7 +1,13 @@
 import os
+import sys
+from functools import lru_cache
+
 from dotenv import load_dotenv
 
-load_dotenv()
+# Deployments that inject env vars directly can set COMPASS_SKIP_DOTENV=1 to
+# skip reading .env in every worker process
+if not os.getenv("COMPASS_SKIP_DOTENV"):
+    load_dotenv()
 
 # AWS Configuration
 AWS_REGION = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
@@ -21,6 +27,9 @@ NOVA_ACT_API_KEY = os.getenv("NOVA_ACT_API_KEY", "")
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", 8000))
 DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+# asyncio event loop implementation passed to uvicorn. uvloop ships with
+# uvicorn[standard] and is not available on Windows.
+EVENT_LOOP = os.getenv("EVENT_LOOP", "asyncio" if sys.platform == "win32" else "uvloop")
 
 # Nova Sonic Audio Config
 AUDIO_SAMPLE_RATE = 16000
@@ -39,10 +48,27 @@ NOVA_LITE_MAX_TOKENS = 2048
 NOVA_LITE_TEMPERATURE = 0.4
 NOVA_LITE_TOP_P = 0.9
 
+# Most recent user/assistant turns sent to the model; older history stays in the session
+NOVA_LITE_MAX_HISTORY_TURNS = int(os.getenv("NOVA_LITE_MAX_HISTORY_TURNS", 20))
+
+# Maximum number of tool calls executed concurrently within one model turn
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", 4))
+
+# In-memory session cache bounds (used when no SessionStore is configured)
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", 1024))
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 3600))
+
+# SessionStore write-behind delay: saves within this window are coalesced into one transaction
+SESSION_FLUSH_SECONDS = float(os.getenv("SESSION_FLUSH_SECONDS", 0.25))
+
+# Number of Bedrock text deltas coalesced into one SSE event in chat_stream
+STREAM_N = int(os.getenv("STREAM_N", 4))
+
 # Embedding dimensions
 EMBEDDING_DIMENSION = 1024
 
 # 2024 Federal Poverty Level (FPL) Annual Thresholds by household size
+FPL_YEAR = 2024
 FPL_2024 = {
     1: 15060,
     2: 20440,
@@ -54,7 +80,10 @@ FPL_2024 = {
     8: 52720,
 }
 
+FPL_2024_PER_ADDITIONAL_PERSON = 5380
+
+
+@lru_cache(maxsize=64)
 def get_fpl(household_size: int) -> int:
-    if household_size <= 8:
-        return FPL_2024.get(household_size, FPL_2024[8])
-    return FPL_2024[8] + (household_size - 8) * 5380
+    base = FPL_2024.get(min(household_size, 8), FPL_2024[8])
+    return base + max(0, household_size - 8) * FPL_2024_PER_ADDITIONAL_PERSON
@@ -3,9 +3,64 @@ Federal and state benefits programs knowledge base.
 Eligibility thresholds reflect 2024 federal guidelines.
 """
 
-from typing import Optional
+import gzip
+import hashlib
+import re
+import sys
+from collections import defaultdict
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import Any, Optional
 
-BENEFITS_PROGRAMS = [
+import orjson
+from pydantic import ConfigDict, TypeAdapter, with_config
+from typing_extensions import NotRequired, TypedDict
+
+from backend.config import FPL_2024, get_fpl
+
+
+@dataclass(slots=True, frozen=True)
+class Eligibility:
+    citizenship: str
+    special_rules: tuple[str, ...]
+    gross_income_pct_fpl: Optional[int] = None
+    net_income_pct_fpl: Optional[int] = None
+    asset_limit_dollars: Optional[int] = None
+    age_requirement: Optional[str] = None
+    max_income_pct_ami: Optional[int] = None
+    max_income_dollars: Optional[int] = None
+    max_income_2024: Optional[Mapping[str, int]] = None
+    # Derived at import: annual dollar limits for household sizes 1–8
+    gross_income_limits_annual: Optional[tuple[int, ...]] = None
+    net_income_limits_annual: Optional[tuple[int, ...]] = None
+
+
+@dataclass(slots=True, frozen=True)
+class Program:
+    id: str
+    name: str
+    short_name: str
+    category: str
+    description: str
+    eligibility: Eligibility
+    avg_benefit: Mapping[str, str]
+    apply_url: str
+    how_to_apply: str
+    portal_steps: tuple[str, ...]
+    timeline: str
+    tags: tuple[str, ...]
+    # Derived at import: avg_benefit entries that state a monthly amount, in cents
+    avg_benefit_monthly_cents: Mapping[str, int]
+    # Programs whose approval makes this one categorically eligible (income test skipped)
+    auto_eligible_if: tuple[str, ...] = ()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Plain, JSON-serializable dict of this program."""
+        return _thaw({f.name: getattr(self, f.name) for f in fields(self)})
+
+
+_RAW_PROGRAMS = [
     {
         "id": "snap",
         "name": "SNAP (Supplemental Nutrition Assistance Program)",
@@ -78,6 +133,7 @@ BENEFITS_PROGRAMS = [
         ],
         "timeline": "Eligibility determined within 45 days (90 days for disability-based)",
         "tags": ["healthcare", "health insurance", "medical", "doctor", "hospital", "prescription"],
+        "auto_eligible_if": ["ssi"],
     },
     {
         "id": "chip",
@@ -183,6 +239,7 @@ BENEFITS_PROGRAMS = [
         ],
         "timeline": "Appointments usually available within a few days",
         "tags": ["pregnant", "baby", "infant", "breastfeeding", "food", "nutrition", "mother", "child"],
+        "auto_eligible_if": ["snap", "medicaid", "tanf"],
     },
     {
         "id": "liheap",
@@ -480,6 +537,7 @@ BENEFITS_PROGRAMS = [
         ],
         "timeline": "Decision typically within 2-3 weeks",
         "tags": ["medicare", "prescription", "drug costs", "elderly", "senior", "Part D", "LIS"],
+        "auto_eligible_if": ["medicaid", "ssi", "medicare_savings"],
     },
     {
         "id": "nslp",
@@ -515,6 +573,7 @@ BENEFITS_PROGRAMS = [
         ],
         "timeline": "Usually approved within a few days; benefits start immediately upon approval",
         "tags": ["school", "children", "kids", "lunch", "food", "education", "K-12"],
+        "auto_eligible_if": ["snap", "tanf"],
     },
     {
         "id": "ccdf",
@@ -585,6 +644,7 @@ BENEFITS_PROGRAMS = [
         ],
         "timeline": "Approval typically within a few days",
         "tags": ["phone", "internet", "broadband", "communication", "utilities", "technology"],
+        "auto_eligible_if": ["snap", "medicaid", "ssi"],
     },
     {
         "id": "head_start",
@@ -971,11 +1031,176 @@ BENEFITS_PROGRAMS = [
     },
 ]
 
-# Build lookup dict by ID
-BENEFITS_BY_ID = {p["id"]: p for p in BENEFITS_PROGRAMS}
+
+# First "$N/month" figure in a free-text amount, e.g. "Up to $943/month (2024)"
+_MONTHLY_DOLLARS_RE = re.compile(r"\$([\d,]+(?:\.\d+)?)/month")
+
+
+def _parse_monthly_cents(text: str) -> Optional[int]:
+    match = _MONTHLY_DOLLARS_RE.search(text)
+    if not match:
+        return None
+    return round(float(match.group(1).replace(",", "")) * 100)
+
+
+def _with_derived_fields(program: dict) -> dict:
+    """
+    Add numeric fields derived from the free-text catalog entries, so nothing
+    downstream has to re-parse the strings per request.
+
+    avg_benefit_monthly_cents maps each avg_benefit key that states a monthly
+    dollar amount to that amount in cents; annual or descriptive entries are left out.
+
+    eligibility gains gross_income_limits_annual / net_income_limits_annual for
+    programs with an FPL-percentage limit: the annual dollar limit for household
+    sizes 1–8 (index 0 is a household of one), against the FPL_YEAR table.
+    """
+    monthly_cents = {}
+    for key, text in program.get("avg_benefit", {}).items():
+        cents = _parse_monthly_cents(text)
+        if cents is not None:
+            monthly_cents[key] = cents
+
+    eligibility = dict(program["eligibility"])
+    for kind in ("gross", "net"):
+        pct = eligibility.get(f"{kind}_income_pct_fpl")
+        if pct is not None:
+            eligibility[f"{kind}_income_limits_annual"] = tuple(
+                FPL_2024[size] * pct // 100 for size in range(1, 9)
+            )
+
+    # Low-cardinality labels shared across programs and compared against
+    # literals elsewhere: intern them so equal values are one object
+    eligibility["citizenship"] = sys.intern(eligibility["citizenship"])
+
+    return {
+        **program,
+        "category": sys.intern(program["category"]),
+        "tags": [sys.intern(t) for t in program.get("tags", [])],
+        "eligibility": eligibility,
+        "avg_benefit_monthly_cents": monthly_cents,
+    }
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Inverse of _freeze, also unpacking Eligibility, for serialization."""
+    if isinstance(value, Eligibility):
+        value = {f.name: getattr(value, f.name) for f in fields(value)}
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+# Schema of the hand-edited literal above. It is validated once at import, so a
+# typo'd key or wrong type fails loudly at startup instead of surfacing later.
+@with_config(ConfigDict(extra="forbid", strict=True))
+class _EligibilitySchema(TypedDict):
+    citizenship: str
+    special_rules: list[str]
+    gross_income_pct_fpl: Optional[int]
+    asset_limit_dollars: Optional[int]
+    age_requirement: NotRequired[Optional[str]]
+    net_income_pct_fpl: NotRequired[Optional[int]]
+    max_income_pct_ami: NotRequired[Optional[int]]
+    max_income_dollars: NotRequired[Optional[int]]
+    max_income_2024: NotRequired[dict[str, int]]
+
+
+@with_config(ConfigDict(extra="forbid", strict=True))
+class _ProgramSchema(TypedDict):
+    id: str
+    name: str
+    short_name: str
+    category: str
+    description: str
+    eligibility: _EligibilitySchema
+    avg_benefit: dict[str, str]
+    apply_url: str
+    how_to_apply: str
+    portal_steps: list[str]
+    timeline: str
+    tags: list[str]
+    auto_eligible_if: NotRequired[list[str]]
+
+
+_CATALOG_SCHEMA = TypeAdapter(list[_ProgramSchema])
+
+
+def _build_program(raw: dict) -> Program:
+    derived = _with_derived_fields(raw)
+    eligibility = Eligibility(**{k: _freeze(v) for k, v in derived.pop("eligibility").items()})
+    return Program(**{k: _freeze(v) for k, v in derived.items()}, eligibility=eligibility)
+
+
+# The catalog is static reference data: build it once at import as frozen,
+# slotted Program records so every consumer shares the same read-only objects.
+# Use Program.to_dict() when a plain dict is needed.
+BENEFITS_PROGRAMS: tuple[Program, ...] = tuple(
+    _build_program(p) for p in _CATALOG_SCHEMA.validate_python(_RAW_PROGRAMS)
+)
+del _RAW_PROGRAMS
+
+
+def get_programs() -> tuple[Program, ...]:
+    """Return the shared, read-only program catalog (no copy)."""
+    return BENEFITS_PROGRAMS
+
+
+# Lookup indexes, built once at import. The public ones are read-only views so
+# no caller can alter the shared catalog.
+BENEFITS_BY_ID: Mapping[str, Program] = MappingProxyType({p.id: p for p in BENEFITS_PROGRAMS})
+
+_by_category: dict[str, list] = defaultdict(list)
+_by_tag: dict[str, list] = defaultdict(list)
+for _p in BENEFITS_PROGRAMS:
+    _by_category[_p.category].append(_p)
+    for _tag in _p.tags:
+        _by_tag[sys.intern(_tag.lower())].append(_p)
+_BY_CATEGORY: dict[str, tuple[Program, ...]] = {k: tuple(v) for k, v in _by_category.items()}
+_BY_TAG: dict[str, tuple[Program, ...]] = {k: tuple(v) for k, v in _by_tag.items()}
+del _by_category, _by_tag, _p, _tag
+
+# Id-valued views of the same indexes, for callers that combine filters with
+# set operations: lowercased tag → program ids, category → ids in catalog order
+BENEFITS_BY_TAG: Mapping[str, frozenset[str]] = MappingProxyType({
+    tag: frozenset(p.id for p in programs) for tag, programs in _BY_TAG.items()
+})
+BENEFITS_BY_CATEGORY: Mapping[str, tuple[str, ...]] = MappingProxyType({
+    category: tuple(p.id for p in programs) for category, programs in _BY_CATEGORY.items()
+})
+
+
+def income_limit(program: Program, household_size: int, kind: str = "gross") -> Optional[int]:
+    """
+    Annual income limit in dollars for a household size, or None if the program
+    has no FPL-based limit of that kind ('gross' or 'net').
+    """
+    limits = getattr(program.eligibility, f"{kind}_income_limits_annual")
+    if limits is None:
+        return None
+    if household_size <= 8:
+        return limits[max(household_size, 1) - 1]
+    return get_fpl(household_size) * getattr(program.eligibility, f"{kind}_income_pct_fpl") // 100
+
+
+def get_by_id(program_id: str) -> Optional[Program]:
+    """Return the program with this id, or None."""
+    return BENEFITS_BY_ID.get(program_id)
+
 
 # Category descriptions for UI
-BENEFIT_CATEGORIES = {
+BENEFIT_CATEGORIES: Mapping[str, Mapping[str, str]] = _freeze({
     "food": {"label": "Food Assistance", "icon": "🥗", "color": "green"},
     "healthcare": {"label": "Healthcare", "icon": "🏥", "color": "blue"},
     "cash_assistance": {"label": "Cash Assistance", "icon": "💰", "color": "yellow"},
@@ -984,4 +1209,29 @@ BENEFIT_CATEGORIES = {
     "housing": {"label": "Housing", "icon": "🏠", "color": "red"},
     "tax_credit": {"label": "Tax Credits", "icon": "📋", "color": "teal"},
     "childcare": {"label": "Child Care", "icon": "👶", "color": "pink"},
-}
+})
+# Serialized once: the categories never change while the process runs
+BENEFIT_CATEGORIES_JSON: bytes = orjson.dumps(_thaw(BENEFIT_CATEGORIES))
+
+
+# /api/programs body: a trimmed summary of each program, serialized once at
+# import (plus a gzip copy and an ETag) so the handler only sends bytes.
+PROGRAMS_SUMMARY_JSON: bytes = orjson.dumps({
+    "programs": [
+        {
+            "id": p.id,
+            "name": p.name,
+            "category": p.category,
+            "description": p.description[:200] + "...",
+            "apply_url": p.apply_url,
+        }
+        for p in BENEFITS_PROGRAMS
+    ]
+})
+PROGRAMS_SUMMARY_GZIP: bytes = gzip.compress(PROGRAMS_SUMMARY_JSON, compresslevel=6)
+PROGRAMS_SUMMARY_ETAG: str = '"' + hashlib.blake2b(PROGRAMS_SUMMARY_JSON, digest_size=16).hexdigest() + '"'
+
+# Full record of each program, serialized once, for the detail endpoint
+PROGRAM_DETAIL_JSON: Mapping[str, bytes] = MappingProxyType({
+    p.id: orjson.dumps(p.to_dict()) for p in BENEFITS_PROGRAMS
+})
@@ -0,0 +1,122 @@
+"""
+Fast catalog screening against the FPL-based income limits in benefits_db.
+
+This is a coarse first pass over the program catalog — which programs an
+income is within the published limit for — not the full rule set in
+backend/tools/eligibility.py.
+"""
+
+from collections.abc import Iterable
+from typing import Optional
+
+import numpy as np
+
+from backend.config import FPL_2024, FPL_2024_PER_ADDITIONAL_PERSON
+from backend.data.benefits_db import BENEFITS_PROGRAMS
+
+# ---------------------------------------------------------------------------
+# Column arrays over the catalog (one entry per program, catalog order).
+# "No limit" is stored as NO_LIMIT, a value no real amount reaches, so every
+# check is a single <= with no special case. Only the numeric fields screening
+# needs live here; descriptions, steps etc. stay on the Program records.
+# ---------------------------------------------------------------------------
+
+NO_LIMIT = 1 << 62
+
+_PROGRAM_IDS: tuple[str, ...] = tuple(p.id for p in BENEFITS_PROGRAMS)
+_PROGRAM_INDEX: dict[str, int] = {pid: i for i, pid in enumerate(_PROGRAM_IDS)}
+
+# Gross income limit (annual dollars) by household size: row i is size i + 1
+_GROSS_LIMITS = np.full((8, len(_PROGRAM_IDS)), NO_LIMIT, dtype=np.int64)
+# Gross limit as % of FPL, for extrapolating households larger than 8
+_GROSS_PCT = np.full(len(_PROGRAM_IDS), -1, dtype=np.int64)
+_ASSET_LIMITS = np.full(len(_PROGRAM_IDS), NO_LIMIT, dtype=np.int64)
+# Flat annual income cap in dollars, independent of household size
+_MAX_INCOME = np.full(len(_PROGRAM_IDS), NO_LIMIT, dtype=np.int64)
+
+for _i, _p in enumerate(BENEFITS_PROGRAMS):
+    _elig = _p.eligibility
+    if _elig.gross_income_limits_annual is not None:
+        _GROSS_LIMITS[:, _i] = _elig.gross_income_limits_annual
+        _GROSS_PCT[_i] = _elig.gross_income_pct_fpl
+    if _elig.asset_limit_dollars is not None:
+        _ASSET_LIMITS[_i] = _elig.asset_limit_dollars
+    if _elig.max_income_dollars is not None:
+        _MAX_INCOME[_i] = _elig.max_income_dollars
+del _i, _p, _elig
+
+# Categorical-eligibility edges: (program index, indexes of programs that confer it)
+_AUTO_ELIGIBLE: tuple[tuple[int, frozenset[int]], ...] = tuple(
+    (i, frozenset(_PROGRAM_INDEX[src] for src in p.auto_eligible_if))
+    for i, p in enumerate(BENEFITS_PROGRAMS)
+    if p.auto_eligible_if
+)
+
+
+def screen_households(
+    annual_incomes,
+    household_sizes,
+    assets=None,
+    receiving: Optional[list[Iterable[str]]] = None,
+) -> list[list[str]]:
+    """
+    Return, per household, ids of programs whose numeric limits it does not
+    exceed, in catalog order: one screen_batch pass, then each household's
+    categorical edges.
+
+    Only the FPL-based gross income limit, a flat annual income cap and the
+    asset limit are checked; programs without one of those limits pass that
+    check. Age and other requirements are free text in the catalog and are
+    left to the full rules.
+
+    receiving, if given, has one list per household of programs it already
+    gets. Programs that are categorically eligible through one of those
+    (Program.auto_eligible_if, e.g. WIC via SNAP) are included without
+    checking their own limits. Passing this coarse screen alone does not
+    confer categorical eligibility.
+    """
+    matrix = screen_batch(annual_incomes, household_sizes, assets)
+    if receiving is None:
+        receiving = [()] * len(matrix)
+    return [_program_ids(row, received) for row, received in zip(matrix, receiving)]
+
+
+def _program_ids(mask: np.ndarray, receiving: Iterable[str]) -> list[str]:
+    passed = set(np.flatnonzero(mask).tolist())
+    if receiving:
+        enrolled = {_PROGRAM_INDEX[pid] for pid in receiving if pid in _PROGRAM_INDEX}
+        changed = True
+        while changed:  # edges can chain (SSI → Medicaid → Extra Help)
+            changed = False
+            for i, sources in _AUTO_ELIGIBLE:
+                if i not in enrolled and not sources.isdisjoint(enrolled):
+                    enrolled.add(i)
+                    changed = True
+        passed |= enrolled
+    return [_PROGRAM_IDS[i] for i in sorted(passed)]
+
+
+def screen_batch(annual_incomes, household_sizes, assets=None) -> np.ndarray:
+    """
+    Screen many households at once.
+
+    Takes array-likes of length N (assets defaults to all zero) and returns an
+    N x M boolean matrix, one column per program in BENEFITS_PROGRAMS order,
+    with the same per-program checks as screen_households, without the
+    categorical edges.
+    """
+    incomes = np.asarray(annual_incomes, dtype=np.float64)
+    sizes = np.maximum(np.asarray(household_sizes, dtype=np.int64), 1)
+    held = np.zeros_like(incomes) if assets is None else np.asarray(assets, dtype=np.float64)
+
+    limits = _GROSS_LIMITS[np.minimum(sizes, 8) - 1]  # (N, M)
+    large = sizes > 8
+    if large.any():
+        fpl = FPL_2024[8] + (sizes[large] - 8) * FPL_2024_PER_ADDITIONAL_PERSON
+        limits[large] = np.where(_GROSS_PCT < 0, NO_LIMIT, fpl[:, None] * _GROSS_PCT // 100)
+
+    return (
+        (incomes[:, None] <= limits)
+        & (incomes[:, None] <= _MAX_INCOME)
+        & (held[:, None] <= _ASSET_LIMITS)
+    )
@@ -4,19 +4,36 @@ Uses aiosqlite for async I/O so it doesn't block the FastAPI event loop.
 Falls back gracefully to in-memory only if the DB file can't be opened.
 """
 
-import json
+import asyncio
+import contextlib
 import logging
 import os
-from datetime import datetime
+import time
 from typing import Any, Optional
 from uuid import uuid4
 
 import aiosqlite
+import orjson
+
+from backend.config import SESSION_FLUSH_SECONDS
 
 logger = logging.getLogger(__name__)
 
 DB_PATH = os.environ.get("COMPASS_DB_PATH", "./data/compass.db")
 
+# Applied once per connection in init_db. Sessions are a cache of recent
+# conversations, so losing the last few commits on power loss is acceptable:
+# WAL + synchronous=NORMAL fsyncs at checkpoints rather than on every save,
+# and lets loads read while a save is writing.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",  # KiB, i.e. ~20 MB of page cache
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",  # so deleting a session cascades to its messages
+)
+
 
 class SessionStore:
     """
@@ -36,8 +53,25 @@ class SessionStore:
 
     def __init__(self) -> None:
         self._cache: dict[str, dict] = {}
+        # Session id → the message content lists already in SQLite, in order.
+        # Messages are append-only in normal use, so a save inserts only what
+        # follows this prefix (see _save_to_db).
+        self._persisted: dict[str, list] = {}
+        # Session id → hash of each sessions column's serialized value as last
+        # written, so a save updates only the columns whose value changed. Only
+        # the 64-bit hashes are kept, not a second copy of every blob.
+        self._persisted_fields: dict[str, dict[str, int]] = {}
         self._db_path = DB_PATH
         self._db_available = False
+        # One connection for the life of the store; aiosqlite runs it on a
+        # single worker thread, so calls are already serialized.
+        self._db: Optional[aiosqlite.Connection] = None
+        # Held across multi-statement writes so two flushes never share a transaction
+        self._write_lock = asyncio.Lock()
+        # Write-behind: saved sessions wait here until the next flush, each with
+        # its message list as of the save (a later turn appends to the live one)
+        self._dirty: dict[str, tuple[dict, list]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -47,44 +81,68 @@ class SessionStore:
         """Create DB file and tables. Call once at application startup."""
         try:
             os.makedirs(os.path.dirname(self._db_path) or ".", exist_ok=True)
-            async with aiosqlite.connect(self._db_path) as db:
-                await db.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS sessions (
-                        id TEXT PRIMARY KEY,
-                        created_at TEXT NOT NULL,
-                        user_profile TEXT NOT NULL DEFAULT '{}',
-                        eligible_programs TEXT NOT NULL DEFAULT '[]',
-                        local_resources TEXT NOT NULL DEFAULT '[]',
-                        action_plan TEXT,
-                        document_analysis TEXT
-                    )
-                    """
+            db = self._db = await aiosqlite.connect(self._db_path)
+            for pragma in _PRAGMAS:
+                await db.execute(pragma)
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    created_at INTEGER NOT NULL,  -- Unix epoch milliseconds
+                    user_profile TEXT NOT NULL DEFAULT '{}',
+                    eligible_programs TEXT NOT NULL DEFAULT '[]',
+                    local_resources TEXT NOT NULL DEFAULT '[]',
+                    action_plan TEXT,
+                    document_analysis TEXT
                 )
-                await db.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS messages (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
-                        role TEXT NOT NULL,
-                        content TEXT NOT NULL,
-                        created_at TEXT NOT NULL
-                    )
-                    """
+                """
+            )
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+                    role TEXT NOT NULL,
+                    content BLOB NOT NULL,  -- orjson bytes (older rows may be TEXT)
+                    created_at INTEGER NOT NULL  -- Unix epoch milliseconds
                 )
-                await db.commit()
+                """
+            )
+            # Serves the per-session, id-ordered message load without a scan or sort
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_messages_session_id ON messages (session_id, id)"
+            )
+            await db.commit()
             self._db_available = True
             logger.info("SessionStore: database ready at %s", self._db_path)
         except Exception as exc:
             logger.warning(
                 "SessionStore: could not open SQLite DB (%s) — using in-memory only", exc
             )
-            self._db_available = False
+            await self.close()
+
+    async def close(self) -> None:
+        """Write pending sessions and close the database connection. Call once at shutdown."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        if self._db_available:
+            await self.flush()
+        self._db_available = False
+        if self._db is not None:
+            db, self._db = self._db, None
+            await db.close()
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
+    def get_cached(self, session_id: str) -> Optional[dict]:
+        """Return the session if it is already in memory, without touching SQLite."""
+        return self._cache.get(session_id)
+
     async def get_or_create_session(self, session_id: Optional[str] = None) -> dict:
         """
         Return an existing session or create a new one.
@@ -110,7 +168,13 @@ class SessionStore:
         return session
 
     async def save_session(self, session: dict) -> None:
-        """Persist session state (non-blocking; errors are logged, not raised)."""
+        """
+        Persist session state. The session is cached immediately and written
+        to SQLite by the next flush, SESSION_FLUSH_SECONDS later, so a burst of
+        saves costs one transaction. The messages written are those present
+        now, not whatever a turn running at flush time has appended since.
+        Write errors are logged, not raised.
+        """
         sid = session.get("session_id")
         if not sid:
             return
@@ -120,10 +184,35 @@ class SessionStore:
         if not self._db_available:
             return
 
-        try:
-            await self._save_to_db(session)
-        except Exception as exc:
-            logger.warning("SessionStore: failed to persist session %s: %s", sid, exc)
+        self._dirty[sid] = (session, list(session.get("messages", [])))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        """
+        Write every pending session to SQLite now, in one transaction. If the
+        transaction fails as a whole, the batch stays pending for the next
+        flush (the next save, or close).
+        """
+        while self._dirty:
+            pending, self._dirty = self._dirty, {}
+            try:
+                await self._save_to_db(list(pending.values()))
+            except asyncio.CancelledError:
+                # Interrupted (shutdown): leave the batch for the final flush,
+                # behind any newer save of the same session
+                self._dirty = {**pending, **self._dirty}
+                raise
+            except Exception as exc:
+                self._dirty = {**pending, **self._dirty}
+                logger.warning(
+                    "SessionStore: failed to persist sessions %s: %s", ", ".join(pending), exc
+                )
+                return
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(SESSION_FLUSH_SECONDS)
+        await self.flush()
 
     async def get_session(self, session_id: str) -> Optional[dict]:
         """Return session or None if not found."""
@@ -139,12 +228,19 @@ class SessionStore:
     async def clear_session(self, session_id: str) -> None:
         """Delete session from memory and DB."""
         self._cache.pop(session_id, None)
+        self._dirty.pop(session_id, None)
         if not self._db_available:
+            self._persisted.pop(session_id, None)
+            self._persisted_fields.pop(session_id, None)
             return
         try:
-            async with aiosqlite.connect(self._db_path) as db:
-                await db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
-                await db.commit()
+            async with self._write_lock:
+                # Dropped under the lock, after any in-flight flush has recorded
+                # what it wrote, so no bookkeeping outlives the deleted rows
+                self._persisted.pop(session_id, None)
+                self._persisted_fields.pop(session_id, None)
+                await self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                await self._db.commit()
         except Exception as exc:
             logger.warning("SessionStore: failed to clear session %s: %s", session_id, exc)
 
@@ -158,48 +254,109 @@ class SessionStore:
 
     async def _load_from_db(self, session_id: str) -> Optional[dict]:
         try:
-            async with aiosqlite.connect(self._db_path) as db:
-                db.row_factory = aiosqlite.Row
-
-                # Load session row
-                async with db.execute(
-                    "SELECT * FROM sessions WHERE id = ?", (session_id,)
-                ) as cursor:
-                    row = await cursor.fetchone()
-
-                if not row:
-                    return None
-
-                session = _empty_session(session_id)
-                session["user_profile"] = json.loads(row["user_profile"] or "{}")
-                session["eligible_programs"] = json.loads(row["eligible_programs"] or "[]")
-                session["local_resources"] = json.loads(row["local_resources"] or "[]")
-                session["action_plan"] = (
-                    json.loads(row["action_plan"]) if row["action_plan"] else None
-                )
-                session["document_analysis"] = (
-                    json.loads(row["document_analysis"]) if row["document_analysis"] else None
-                )
+            db = self._db
 
-                # Load messages
-                async with db.execute(
-                    "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id",
-                    (session_id,),
-                ) as cursor:
-                    rows = await cursor.fetchall()
+            # Load session row (plain tuple, unpacked in SELECT order)
+            async with db.execute(
+                """
+                SELECT user_profile, eligible_programs, local_resources,
+                       action_plan, document_analysis
+                FROM sessions WHERE id = ?
+                """,
+                (session_id,),
+            ) as cursor:
+                row = await cursor.fetchone()
+
+            if not row:
+                return None
+
+            user_profile, eligible_programs, local_resources, action_plan, document_analysis = row
+            session = _empty_session(session_id)
+            session["user_profile"] = orjson.loads(user_profile or "{}")
+            session["eligible_programs"] = orjson.loads(eligible_programs or "[]")
+            session["local_resources"] = orjson.loads(local_resources or "[]")
+            session["action_plan"] = orjson.loads(action_plan) if action_plan else None
+            session["document_analysis"] = (
+                orjson.loads(document_analysis) if document_analysis else None
+            )
 
-                session["messages"] = [
-                    {"role": r["role"], "content": json.loads(r["content"])} for r in rows
-                ]
+            # Load messages
+            async with db.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id",
+                (session_id,),
+            ) as cursor:
+                rows = await cursor.fetchall()
 
-                return session
+            session["messages"] = [
+                {"role": role, "content": orjson.loads(content)} for role, content in rows
+            ]
+            self._persisted[session_id] = [m["content"] for m in session["messages"]]
+
+            return session
         except Exception as exc:
             logger.warning("SessionStore: DB load error for %s: %s", session_id, exc)
             return None
 
-    async def _save_to_db(self, session: dict) -> None:
+    async def _save_to_db(self, sessions: list[tuple[dict, list]]) -> None:
+        db = self._db
+        async with self._write_lock:
+            written = {}
+            now_ms = time.time_ns() // 1_000_000
+            try:
+                # Explicit, so the savepoints below nest inside it rather than
+                # each starting (and on RELEASE committing) a transaction
+                await db.execute("BEGIN")
+                for session, messages in sessions:
+                    sid = session["session_id"]
+                    if self._cache.get(sid) is not session:
+                        continue  # cleared since it was saved
+                    # One savepoint per session: a session that fails to write
+                    # is rolled back and logged without losing the rest of the
+                    # batch. Its bookkeeping is untouched, so its next save
+                    # writes everything still missing.
+                    await db.execute("SAVEPOINT session_write")
+                    try:
+                        written[sid] = await self._write_session(db, session, messages, now_ms)
+                    except Exception as exc:
+                        await db.execute("ROLLBACK TO session_write")
+                        logger.warning("SessionStore: failed to persist session %s: %s", sid, exc)
+                    finally:
+                        await db.execute("RELEASE session_write")
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+            for sid, (contents, hashes) in written.items():
+                self._persisted[sid] = contents
+                self._persisted_fields[sid] = hashes
+
+    async def _write_session(
+        self, db: aiosqlite.Connection, session: dict, messages: list, now_ms: int
+    ) -> tuple[list, dict[str, int]]:
+        """
+        Stage one session's rows in the current transaction, with messages (the
+        list as of save_session) as its history. Returns the message content
+        lists written and the column value hashes, for _persisted /
+        _persisted_fields once the commit lands.
+        """
         sid = session["session_id"]
-        async with aiosqlite.connect(self._db_path) as db:
+        fields = {
+            "user_profile": _dumps(session.get("user_profile", {})),
+            "eligible_programs": _dumps(session.get("eligible_programs", [])),
+            "local_resources": _dumps(session.get("local_resources", [])),
+            "action_plan": _dumps(session["action_plan"]) if session.get("action_plan") else None,
+            "document_analysis": (
+                _dumps(session["document_analysis"])
+                if session.get("document_analysis")
+                else None
+            ),
+        }
+
+        # Tools mutate these in place, so compare serialized values rather than
+        # object identity. A plain chat turn usually changes none of them.
+        hashes = {name: hash(value) for name, value in fields.items()}
+        last = self._persisted_fields.get(sid)
+        if last is None:
             await db.execute(
                 """
                 INSERT INTO sessions (id, created_at, user_profile, eligible_programs,
@@ -212,30 +369,37 @@ class SessionStore:
                     action_plan        = excluded.action_plan,
                     document_analysis  = excluded.document_analysis
                 """,
-                (
-                    sid,
-                    datetime.utcnow().isoformat(),
-                    json.dumps(session.get("user_profile", {})),
-                    json.dumps(session.get("eligible_programs", [])),
-                    json.dumps(session.get("local_resources", [])),
-                    json.dumps(session["action_plan"]) if session.get("action_plan") else None,
-                    (
-                        json.dumps(session["document_analysis"])
-                        if session.get("document_analysis")
-                        else None
-                    ),
-                ),
+                (sid, now_ms, *fields.values()),
             )
-
-            # Replace all messages for this session
-            await db.execute("DELETE FROM messages WHERE session_id = ?", (sid,))
-            for msg in session.get("messages", []):
+        else:
+            changed = [name for name, h in hashes.items() if h != last[name]]
+            if changed:
+                # Column names come from the fixed keys above, never from input
                 await db.execute(
-                    "INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
-                    (sid, msg["role"], json.dumps(msg["content"]), datetime.utcnow().isoformat()),
+                    f"UPDATE sessions SET {', '.join(f'{name} = ?' for name in changed)} WHERE id = ?",
+                    (*(fields[name] for name in changed), sid),
                 )
 
-            await db.commit()
+        # Insert only messages added since the last save. If the history was
+        # trimmed or an earlier message rewritten in place (an uploaded image
+        # swapped for a placeholder), or this process has not written the
+        # session before, replace the stored messages wholesale instead.
+        persisted = self._persisted.get(sid)
+        if (
+            persisted is not None
+            and len(persisted) <= len(messages)
+            and all(m["content"] is c for m, c in zip(messages, persisted))
+        ):
+            new_messages = messages[len(persisted):]
+        else:
+            await db.execute("DELETE FROM messages WHERE session_id = ?", (sid,))
+            new_messages = messages
+        if new_messages:
+            await db.executemany(
+                "INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                [(sid, msg["role"], _dumps(msg["content"]), now_ms) for msg in new_messages],
+            )
+        return [m["content"] for m in messages], hashes
 
 
 # ------------------------------------------------------------------
@@ -253,3 +417,12 @@ def _empty_session(session_id: str) -> dict[str, Any]:
         "action_plan": None,
         "document_analysis": None,
     }
+
+
+def _dumps(value: Any) -> bytes:
+    """
+    Serialize a session field for storage. The bytes are stored as-is; rows
+    written as TEXT by older versions load the same way.
+    """
+    # OPT_NON_STR_KEYS: json.dumps accepted int keys, keep doing so
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
@@ -4,25 +4,86 @@ Creates PNG images of a pay stub and utility bill so judges can
 test Nova Lite vision + Nova Multimodal Embeddings without needing
 their own documents.
 
-Called once at server startup if the sample files don't already exist.
+Called once at server startup (on a background thread) if the sample files
+don't already exist.
 """
 
+import logging
 import os
+import threading
+import time
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# A temp file older than this was left by a run killed before its os.replace;
+# younger ones may belong to another worker still writing.
+_STALE_TMP_SECONDS = 60
 
 
 def generate_samples(output_dir: Path) -> None:
     """Generate sample document images if they don't exist."""
-    output_dir.mkdir(parents=True, exist_ok=True)
-
     pay_stub_path = output_dir / "sample_pay_stub.png"
     utility_bill_path = output_dir / "sample_utility_bill.png"
 
+    _remove_stale_temps(output_dir)
+
+    # Usual restart: both files are already there, so skip mkdir and the PIL import
+    if pay_stub_path.exists() and utility_bill_path.exists():
+        return
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
     if not pay_stub_path.exists():
-        _generate_pay_stub(pay_stub_path)
+        _write_atomically(pay_stub_path, _generate_pay_stub)
 
     if not utility_bill_path.exists():
-        _generate_utility_bill(utility_bill_path)
+        _write_atomically(utility_bill_path, _generate_utility_bill)
+
+
+def _write_atomically(path: Path, generate: Callable[[Path], None]) -> None:
+    """
+    Run generate on a temporary file next to path, then rename it into place.
+    A process killed mid-write (a --reload restart) leaves no truncated PNG for
+    the exists() check above to keep forever.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        generate(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _remove_stale_temps(output_dir: Path) -> None:
+    """Delete temp files that _write_atomically never renamed (output_dir is served)."""
+    cutoff = time.time() - _STALE_TMP_SECONDS
+    for tmp in output_dir.glob(".sample_*.tmp"):
+        try:
+            if tmp.stat().st_mtime < cutoff:
+                tmp.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def generate_samples_async(output_dir: Path) -> threading.Thread:
+    """
+    Run generate_samples on a daemon thread so server startup doesn't wait on
+    it. Until it finishes the sample URLs 404; errors are logged, not raised.
+    """
+    def run() -> None:
+        try:
+            generate_samples(output_dir)
+            logger.info("Sample documents ready at %s", output_dir)
+        except Exception as e:
+            logger.warning("Could not generate sample documents: %s", e)
+
+    thread = threading.Thread(target=run, name="generate-samples", daemon=True)
+    thread.start()
+    return thread
 
 
 def _generate_pay_stub(path: Path) -> None:
@@ -41,20 +102,38 @@ def _generate_utility_bill(path: Path) -> None:
         _generate_utility_bill_fallback(path)
 
 
+_FONT_PATHS = [
+    "/System/Library/Fonts/Helvetica.ttc",  # macOS
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Linux
+    "/Windows/Fonts/arial.ttf",  # Windows
+]
+
+# First usable entry of _FONT_PATHS, found on the first _get_font call;
+# "" means none loaded and the PIL default is used.
+_RESOLVED_FONT_PATH: Optional[str] = None
+
+
+@lru_cache(maxsize=16)
 def _get_font(size: int):
-    """Try to load a system font, fall back to PIL default."""
+    """
+    Try to load a system font, fall back to PIL default. Cached per size, so
+    both documents share one FreeType face per size.
+    """
+    global _RESOLVED_FONT_PATH
     from PIL import ImageFont
-    font_paths = [
-        "/System/Library/Fonts/Helvetica.ttc",  # macOS
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Linux
-        "/Windows/Fonts/arial.ttf",  # Windows
-    ]
-    for fp in font_paths:
-        if os.path.exists(fp):
-            try:
-                return ImageFont.truetype(fp, size)
-            except Exception:
-                pass
+
+    if _RESOLVED_FONT_PATH is None:
+        _RESOLVED_FONT_PATH = ""
+        for fp in _FONT_PATHS:
+            if os.path.exists(fp):
+                try:
+                    font = ImageFont.truetype(fp, size)
+                except Exception:
+                    continue
+                _RESOLVED_FONT_PATH = fp
+                return font
+    if _RESOLVED_FONT_PATH:
+        return ImageFont.truetype(_RESOLVED_FONT_PATH, size)
     return ImageFont.load_default()
 
 
@@ -143,7 +222,7 @@ def _generate_pay_stub_pil(path: Path) -> None:
     draw.rectangle([0, H - 32, W, H], fill=(241, 245, 249))
     draw.text((20, H - 24), "This is your final paycheck. Questions? Call HR: (510) 555-0192", font=font_sm, fill=(100, 116, 139))
 
-    img.save(str(path), "PNG")
+    img.save(str(path), "PNG", compress_level=1)
 
 
 def _generate_utility_bill_pil(path: Path) -> None:
@@ -219,7 +298,7 @@ def _generate_utility_bill_pil(path: Path) -> None:
     draw.rectangle([0, H - 30, W, H], fill=(240, 253, 244))
     draw.text((20, H - 22), "To set up payment arrangements or apply for CARE/FERA, call 1-800-743-5000", font=font_sm, fill=(22, 101, 52))
 
-    img.save(str(path), "PNG")
+    img.save(str(path), "PNG", compress_level=1)
 
 
 def _generate_pay_stub_fallback(path: Path) -> None:
@@ -230,8 +309,9 @@ def _generate_pay_stub_fallback(path: Path) -> None:
         def chunk(name, data):
             c = zlib.crc32(name + data) & 0xffffffff
             return struct.pack('>I', len(data)) + name + data + struct.pack('>I', c)
-        raw = b''.join(b'\x00' + bytes([255] * w * 3) for _ in range(h))
-        compressed = zlib.compress(raw)
+        # Every scanline is filter byte 0 + white pixels, so build one and repeat it
+        raw = (b'\x00' + b'\xff' * (w * 3)) * h
+        compressed = zlib.compress(raw, 1)
         return (b'\x89PNG\r\n\x1a\n'
                 + chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 2, 0, 0, 0))
                 + chunk(b'IDAT', compressed)
@@ -13,11 +13,11 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
 from backend.agents.orchestrator import CompassOrchestrator
 from backend.database import SessionStore
@@ -87,14 +87,9 @@ async def lifespan(app: FastAPI):
     orchestrator = CompassOrchestrator(store=session_store)
     sonic_service = NovaSonicService()
 
-    # Generate sample documents for demo if they don't exist
-    try:
-        from backend.generate_samples import generate_samples
-        samples_dir = Path(__file__).parent.parent / "frontend" / "static" / "samples"
-        generate_samples(samples_dir)
-        logger.info("Sample documents ready at %s", samples_dir)
-    except Exception as e:
-        logger.warning("Could not generate sample documents: %s", e)
+    # Generate sample documents for demo if they don't exist, off the startup path
+    from backend.generate_samples import generate_samples_async
+    generate_samples_async(Path(__file__).parent.parent / "frontend" / "static" / "samples")
 
     # Initialize embeddings service and pre-compute program embeddings
     embeddings_service = NovaEmbeddingsService()
@@ -108,6 +103,7 @@ async def lifespan(app: FastAPI):
     yield
 
     logger.info("Shutting down Compass...")
+    await session_store.close()
 
 
 app = FastAPI(
@@ -147,6 +143,40 @@ class NavigateRequest(BaseModel):
     demo_mode: Optional[bool] = True
 
 
+# /api/screen bounds: no real household is this large, and one request screens
+# at most this many applicants (the whole batch is one numpy pass in memory)
+MAX_SCREEN_HOUSEHOLD_SIZE = 50
+MAX_SCREEN_APPLICANTS = 1000
+
+
+class ScreenApplicant(BaseModel):
+    id: str
+    annual_income: float = Field(ge=0)
+    household_size: int = Field(ge=1, le=MAX_SCREEN_HOUSEHOLD_SIZE)
+    assets: float = Field(default=0, ge=0)
+    receiving: list[str] = []
+
+
+class ScreenRequest(BaseModel):
+    applicants: list[ScreenApplicant] = Field(max_length=MAX_SCREEN_APPLICANTS)
+
+    @field_validator("applicants")
+    @classmethod
+    def _unique_ids(cls, applicants: list[ScreenApplicant]) -> list[ScreenApplicant]:
+        # Results are keyed by id, so a repeated id would silently overwrite
+        seen: set[str] = set()
+        for applicant in applicants:
+            if applicant.id in seen:
+                raise ValueError(f"duplicate applicant id: {applicant.id!r}")
+            seen.add(applicant.id)
+        return applicants
+
+
+class ScreenResponse(BaseModel):
+    results: dict[str, list[str]]
+    catalog_etag: str
+
+
 # --- Routes ---
 
 @app.get("/")
@@ -371,13 +401,13 @@ async def navigate_portal(request: NavigateRequest):
     portal_url = (
         f"http://localhost:{os.getenv('PORT', 8000)}/demo-portal"
         if request.demo_mode
-        else program.get("apply_url", "https://www.benefits.gov")
+        else program.apply_url or "https://www.benefits.gov"
     )
 
     try:
         result = await _run_nova_act(
             program_id=request.program_id,
-            program_name=program["name"],
+            program_name=program.name,
             apply_url=portal_url,
             user_info=user_info,
             is_demo=request.demo_mode,
@@ -387,10 +417,10 @@ async def navigate_portal(request: NavigateRequest):
         logger.error("Nova Act navigation error: %s", e)
         return {
             "status": "manual",
-            "program_name": program["name"],
-            "apply_url": program.get("apply_url", ""),
-            "instructions": program.get("portal_steps", []),
-            "message": f"Please navigate manually to apply for {program['name']}",
+            "program_name": program.name,
+            "apply_url": program.apply_url,
+            "instructions": list(program.portal_steps),
+            "message": f"Please navigate manually to apply for {program.name}",
             "error": str(e),
         }
 
@@ -536,21 +566,93 @@ async def semantic_search(body: dict):
 
 
 @app.get("/api/programs")
-async def list_programs():
-    """List all available benefit programs."""
-    from backend.data.benefits_db import BENEFITS_PROGRAMS
-    return {
-        "programs": [
-            {
-                "id": p["id"],
-                "name": p["name"],
-                "category": p["category"],
-                "description": p["description"][:200] + "...",
-                "apply_url": p["apply_url"],
-            }
-            for p in BENEFITS_PROGRAMS
-        ]
-    }
+async def list_programs(request: Request):
+    """List all available benefit programs (pre-serialized; supports ETag and gzip)."""
+    from backend.data.benefits_db import (
+        PROGRAMS_SUMMARY_ETAG,
+        PROGRAMS_SUMMARY_GZIP,
+        PROGRAMS_SUMMARY_JSON,
+    )
+
+    headers = {"ETag": PROGRAMS_SUMMARY_ETAG, "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match", ""), PROGRAMS_SUMMARY_ETAG):
+        return Response(status_code=304, headers=headers)
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(PROGRAMS_SUMMARY_GZIP, media_type="application/json", headers=headers)
+    return Response(PROGRAMS_SUMMARY_JSON, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check: '*' or any listed tag, compared weakly (a W/ prefix is ignored)."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """True if Accept-Encoding allows gzip, by name or via '*', with a q-value above 0."""
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding] = q
+    if "gzip" in qualities:
+        return qualities["gzip"] > 0
+    return qualities.get("*", 0) > 0
+
+
+@app.get("/api/programs/{program_id}")
+async def get_program(program_id: str):
+    """Full catalog record for one program (pre-serialized)."""
+    from backend.data.benefits_db import PROGRAM_DETAIL_JSON
+
+    body = PROGRAM_DETAIL_JSON.get(program_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"Program '{program_id}' not found")
+    return Response(body, media_type="application/json")
+
+
+@app.get("/api/categories")
+async def list_categories():
+    """Benefit category labels, icons and colors for the UI (pre-serialized)."""
+    from backend.data.benefits_db import BENEFIT_CATEGORIES_JSON
+
+    return Response(BENEFIT_CATEGORIES_JSON, media_type="application/json")
+
+
+@app.post("/api/screen", response_model=ScreenResponse)
+async def screen_applicants(request: ScreenRequest, response: Response):
+    """
+    Coarse-screen many applicants against every program in one call.
+    Returns the program ids each applicant is within the catalog limits for,
+    plus the catalog ETag so clients can tell which catalog version was used.
+    """
+    from backend.data.benefits_db import PROGRAMS_SUMMARY_ETAG
+    from backend.data.screening import screen_households
+
+    applicants = request.applicants
+    results = screen_households(
+        [a.annual_income for a in applicants],
+        [a.household_size for a in applicants],
+        [a.assets for a in applicants],
+        [a.receiving for a in applicants],
+    )
+    response.headers["Cache-Control"] = "no-store"
+    return ScreenResponse(
+        results={a.id: ids for a, ids in zip(applicants, results)},
+        catalog_etag=PROGRAMS_SUMMARY_ETAG,
+    )
 
 
 @app.get("/api/personas")
@@ -118,16 +118,16 @@ class NovaEmbeddingsService:
         for program in BENEFITS_PROGRAMS:
             # Create a rich text description for embedding
             program_text = (
-                f"{program['name']}: {program['description']} "
-                f"Category: {program['category']}. "
-                f"Tags: {', '.join(program.get('tags', []))}."
+                f"{program.name}: {program.description} "
+                f"Category: {program.category}. "
+                f"Tags: {', '.join(program.tags)}."
             )
             try:
                 embedding = self.embed_text(program_text)
-                self._program_embeddings[program["id"]] = embedding
-                logger.debug("Embedded program: %s", program["id"])
+                self._program_embeddings[program.id] = embedding
+                logger.debug("Embedded program: %s", program.id)
             except Exception as e:
-                logger.warning("Failed to embed program %s: %s", program["id"], e)
+                logger.warning("Failed to embed program %s: %s", program.id, e)
 
         logger.info("Pre-computed embeddings for %d programs", len(self._program_embeddings))
 
@@ -162,11 +162,11 @@ class NovaEmbeddingsService:
 
         results = []
         for program_id, score in top_results:
-            program = BENEFITS_BY_ID.get(program_id, {})
+            program = BENEFITS_BY_ID.get(program_id)
             results.append({
                 "id": program_id,
-                "name": program.get("name", program_id),
-                "category": program.get("category", ""),
+                "name": program.name if program else program_id,
+                "category": program.category if program else "",
                 "similarity_score": round(score, 4),
                 "similarity_pct": f"{score * 100:.1f}%",
             })
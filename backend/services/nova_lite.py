@@ -3,6 +3,7 @@ Amazon Nova 2 Lite service wrapper.
 Handles text conversations, vision analysis, and tool use via the Bedrock Converse API.
 """
 
+import asyncio
 import json
 import logging
 from typing import Any, Generator, Optional
@@ -35,6 +36,7 @@ class NovaLiteService:
         tools: Optional[list[dict]] = None,
         max_tokens: int = NOVA_LITE_MAX_TOKENS,
         temperature: float = NOVA_LITE_TEMPERATURE,
+        tool_config: Optional[dict] = None,
     ) -> dict[str, Any]:
         """
         Send a conversation to Nova Lite and return the full response.
@@ -45,6 +47,7 @@ class NovaLiteService:
             tools: Optional list of tool specifications (JSON schema format)
             max_tokens: Maximum tokens for response
             temperature: Sampling temperature
+            tool_config: Optional prebuilt Bedrock toolConfig; takes precedence over tools
 
         Returns:
             dict with 'text', 'stop_reason', 'tool_calls', 'usage'
@@ -60,7 +63,9 @@ class NovaLiteService:
             },
         }
 
-        if tools:
+        if tool_config:
+            kwargs["toolConfig"] = tool_config
+        elif tools:
             kwargs["toolConfig"] = {"tools": tools}
 
         try:
@@ -94,6 +99,32 @@ class NovaLiteService:
             "usage": response.get("usage", {}),
         }
 
+    async def aconverse(
+        self,
+        messages: list[dict],
+        system_prompt: str,
+        tools: Optional[list[dict]] = None,
+        max_tokens: int = NOVA_LITE_MAX_TOKENS,
+        temperature: float = NOVA_LITE_TEMPERATURE,
+        tool_config: Optional[dict] = None,
+    ) -> dict[str, Any]:
+        """
+        Async variant of converse() for use inside request handlers.
+
+        The Bedrock round-trip runs in a worker thread (boto3 clients are
+        thread-safe), so the event loop keeps serving other sessions while
+        the model responds. Returns the same dict as converse().
+        """
+        return await asyncio.to_thread(
+            self.converse,
+            messages,
+            system_prompt,
+            tools,
+            max_tokens,
+            temperature,
+            tool_config,
+        )
+
     def converse_stream(
         self,
         messages: list[dict],
@@ -101,6 +132,7 @@ class NovaLiteService:
         tools: Optional[list[dict]] = None,
         max_tokens: int = NOVA_LITE_MAX_TOKENS,
         temperature: float = NOVA_LITE_TEMPERATURE,
+        tool_config: Optional[dict] = None,
     ) -> Generator[tuple, None, None]:
         """
         Stream a conversation response from Nova Lite using Bedrock streaming.
@@ -113,6 +145,7 @@ class NovaLiteService:
             messages: Conversation messages in Bedrock format
             system_prompt: System prompt
             tools: Optional tool specifications
+            tool_config: Optional prebuilt Bedrock toolConfig; takes precedence over tools
         """
         kwargs: dict[str, Any] = {
             "modelId": self.model_id,
@@ -124,7 +157,9 @@ class NovaLiteService:
                 "topP": NOVA_LITE_TOP_P,
             },
         }
-        if tools:
+        if tool_config:
+            kwargs["toolConfig"] = tool_config
+        elif tools:
             kwargs["toolConfig"] = {"tools": tools}
 
         try:
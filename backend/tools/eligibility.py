@@ -3,10 +3,14 @@ Benefit eligibility checking tool.
 Determines which federal programs a user likely qualifies for based on their situation.
 """
 
+import re
 from typing import Any
 from backend.config import get_fpl
 from backend.data.benefits_db import BENEFITS_PROGRAMS
 
+# First dollar figure in an estimated_value string
+_AMOUNT_RE = re.compile(r"\$?([\d,]+)")
+
 
 def check_benefit_eligibility(
     annual_income: float,
@@ -424,18 +428,18 @@ def check_benefit_eligibility(
 
 def _build_result(program_id: str, likelihood: str, estimated_value: str, reason: str) -> dict:
     from backend.data.benefits_db import BENEFITS_BY_ID
-    program = BENEFITS_BY_ID.get(program_id, {})
+    program = BENEFITS_BY_ID[program_id]
     return {
         "id": program_id,
-        "name": program.get("name", program_id),
-        "short_name": program.get("short_name", program_id),
-        "category": program.get("category", "other"),
+        "name": program.name,
+        "short_name": program.short_name,
+        "category": program.category,
         "likelihood": likelihood,
         "estimated_value": estimated_value,
         "reason": reason,
-        "apply_url": program.get("apply_url", ""),
-        "how_to_apply": program.get("how_to_apply", ""),
-        "timeline": program.get("timeline", ""),
+        "apply_url": program.apply_url,
+        "how_to_apply": program.how_to_apply,
+        "timeline": program.timeline,
     }
 
 
@@ -478,11 +482,10 @@ def _total_monthly_estimate(eligible: list) -> int:
     for p in eligible:
         val = p.get("estimated_value", "")
         if "month" in val.lower():
-            import re
-            nums = re.findall(r"\$?([\d,]+)", val)
-            if nums:
+            match = _AMOUNT_RE.search(val)
+            if match:
                 try:
-                    total += int(nums[0].replace(",", ""))
+                    total += int(match.group(1).replace(",", ""))
                 except ValueError:
                     pass
     return total
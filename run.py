@@ -123,6 +123,8 @@ def main():
 
     import uvicorn
 
+    from backend.config import EVENT_LOOP
+
     print(f"Starting server at http://localhost:{args.port}")
     print(f"Open http://localhost:{args.port} in your browser\n")
 
@@ -131,6 +133,7 @@ def main():
         host=args.host,
         port=args.port,
         reload=args.reload,
+        loop=EVENT_LOOP,
         log_level="info",
     )
 
@@ -82,3 +82,5 @@ async def client(tmp_path):
             transport=httpx.ASGITransport(app=app), base_url="http://test"
         ) as ac:
             yield ac
+
+        await store.close()
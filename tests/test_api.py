@@ -52,6 +52,63 @@ class TestPrograms:
         for field in ("id", "name", "category", "description"):
             assert field in first
 
+    async def test_list_programs_not_modified_on_matching_etag(self, client):
+        resp = await client.get("/api/programs")
+        etag = resp.headers["etag"]
+        again = await client.get("/api/programs", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        listed = await client.get("/api/programs", headers={"If-None-Match": f'"other", W/{etag}'})
+        assert listed.status_code == 304
+
+    async def test_list_programs_gzip_respects_q_zero(self, client):
+        resp = await client.get("/api/programs", headers={"Accept-Encoding": "gzip;q=0, identity"})
+        assert "content-encoding" not in resp.headers
+        resp = await client.get("/api/programs", headers={"Accept-Encoding": "br, GZIP;q=0.5"})
+        assert resp.headers["content-encoding"] == "gzip"
+
+    async def test_program_detail(self, client):
+        resp = await client.get("/api/programs/snap")
+        assert resp.status_code == 200
+        assert resp.json()["eligibility"]["gross_income_pct_fpl"] == 130
+        assert (await client.get("/api/programs/nope")).status_code == 404
+
+    async def test_list_categories(self, client):
+        resp = await client.get("/api/categories")
+        assert resp.status_code == 200
+        assert resp.json()["food"]["label"] == "Food Assistance"
+
+
+class TestScreen:
+    async def test_screen_batch_of_applicants(self, client):
+        resp = await client.post("/api/screen", json={"applicants": [
+            {"id": "low", "annual_income": 10_000, "household_size": 3},
+            {"id": "high", "annual_income": 500_000, "household_size": 1, "assets": 1_000_000},
+            {"id": "ssi", "annual_income": 500_000, "household_size": 1, "assets": 1_000_000,
+             "receiving": ["ssi"]},
+        ]})
+        assert resp.status_code == 200
+        assert resp.headers["cache-control"] == "no-store"
+        body = resp.json()
+        assert "snap" in body["results"]["low"]
+        assert "snap" not in body["results"]["high"]
+        assert "medicaid" in body["results"]["ssi"]
+        assert body["catalog_etag"]
+
+    @pytest.mark.parametrize("applicant", [
+        {"id": "a", "annual_income": 10_000, "household_size": 0},
+        {"id": "a", "annual_income": 10_000, "household_size": 2**63},
+        {"id": "a", "annual_income": -1, "household_size": 2},
+        {"id": "a", "annual_income": 10_000, "household_size": 2, "assets": -5},
+    ])
+    async def test_screen_rejects_out_of_range_input(self, client, applicant):
+        resp = await client.post("/api/screen", json={"applicants": [applicant]})
+        assert resp.status_code == 422
+
+    async def test_screen_rejects_duplicate_ids(self, client):
+        applicant = {"id": "a", "annual_income": 10_000, "household_size": 2}
+        resp = await client.post("/api/screen", json={"applicants": [applicant, applicant]})
+        assert resp.status_code == 422
+
 
 class TestPersonas:
     async def test_list_personas_returns_200(self, client):
@@ -0,0 +1,146 @@
+"""
+Unit tests for backend/data/benefits_db.py — the static program catalog.
+"""
+
+import json
+from dataclasses import FrozenInstanceError
+
+import pytest
+from pydantic import ValidationError
+
+from backend.config import get_fpl
+from backend.data.screening import screen_batch, screen_households
+from backend.data.benefits_db import (
+    _CATALOG_SCHEMA,
+    BENEFIT_CATEGORIES,
+    BENEFITS_BY_CATEGORY,
+    BENEFITS_BY_ID,
+    BENEFITS_BY_TAG,
+    BENEFITS_PROGRAMS,
+    get_by_id,
+    get_programs,
+    income_limit,
+)
+
+
+class TestCatalog:
+    def test_programs_are_read_only(self):
+        snap = BENEFITS_BY_ID["snap"]
+        with pytest.raises(FrozenInstanceError):
+            snap.name = "changed"
+        with pytest.raises(FrozenInstanceError):
+            snap.eligibility.gross_income_pct_fpl = 999
+        with pytest.raises(TypeError):
+            snap.avg_benefit["individual"] = "$0"
+        assert isinstance(snap.tags, tuple)
+        with pytest.raises(TypeError):
+            BENEFITS_BY_ID["snap"] = snap
+        with pytest.raises(TypeError):
+            BENEFIT_CATEGORIES["food"]["label"] = "changed"
+
+    def test_to_dict_is_plain_and_serializable(self):
+        d = BENEFITS_BY_ID["eitc"].to_dict()
+        assert d["eligibility"]["max_income_2024"]["1_child"] == 49_084
+        assert isinstance(d["tags"], list)
+        json.dumps(d)
+
+    def test_monthly_benefit_cents_derived(self):
+        assert dict(BENEFITS_BY_ID["snap"].avg_benefit_monthly_cents) == {
+            "individual": 19_700,
+            "family_of_3": 60_000,
+            "max_family_of_4": 97_300,
+        }
+        # "$9.25/month discount (~$111/year)" — the monthly figure, not the annual one
+        assert BENEFITS_BY_ID["lifeline"].avg_benefit_monthly_cents["household"] == 925
+        # Annual-only amounts are not mistaken for monthly ones
+        assert "individual" not in BENEFITS_BY_ID["extra_help"].avg_benefit_monthly_cents
+
+    def test_schema_rejects_unknown_keys(self):
+        program = {
+            "id": "x", "name": "X", "short_name": "X", "category": "food", "description": "",
+            "eligibility": {
+                "citizenship": "any", "special_rules": [],
+                "gross_income_pct_fpl": 100, "asset_limit_dollars": None,
+            },
+            "avg_benefit": {}, "apply_url": "", "how_to_apply": "", "portal_steps": [],
+            "timeline": "", "tags": [],
+        }
+        _CATALOG_SCHEMA.validate_python([program])
+        with pytest.raises(ValidationError):
+            _CATALOG_SCHEMA.validate_python([{**program, "tagz": []}])
+        with pytest.raises(ValidationError):
+            _CATALOG_SCHEMA.validate_python([{**program, "tags": "food"}])
+
+    def test_get_programs_returns_shared_catalog(self):
+        assert get_programs() is BENEFITS_PROGRAMS
+
+
+class TestIndexes:
+    def test_get_by_id(self):
+        assert get_by_id("snap").short_name == "SNAP / Food Stamps"
+        assert get_by_id("nope") is None
+
+    def test_category_index_matches_scan(self):
+        expected = tuple(p.id for p in BENEFITS_PROGRAMS if p.category == "food")
+        assert BENEFITS_BY_CATEGORY["food"] == expected
+
+    def test_tag_index_is_lowercased(self):
+        assert "snap" in BENEFITS_BY_TAG["ebt"]
+        assert "EBT" not in BENEFITS_BY_TAG
+
+
+class TestIncomeLimits:
+    def test_limits_match_fpl_percentage(self):
+        snap = BENEFITS_BY_ID["snap"]
+        assert income_limit(snap, 4) == 31_200 * 130 // 100
+        assert income_limit(snap, 4, "net") == 31_200
+        assert income_limit(snap, 10) == get_fpl(10) * 130 // 100
+
+    def test_no_fpl_limit(self):
+        assert income_limit(BENEFITS_BY_ID["ssi"], 2) is None
+        assert income_limit(BENEFITS_BY_ID["medicaid"], 2, "net") is None
+
+
+def screen(annual_income, household_size, assets=0, receiving=()):
+    return screen_households([annual_income], [household_size], [assets], [receiving])[0]
+
+
+class TestScreen:
+    def test_matches_per_program_limits(self):
+        for household_size in (1, 4, 8, 11):
+            for income in (0, 20_000, 45_000, 90_000):
+                expected = [
+                    p.id for p in BENEFITS_PROGRAMS
+                    if (income_limit(p, household_size) is None or income <= income_limit(p, household_size))
+                    and (p.eligibility.max_income_dollars is None
+                         or income <= p.eligibility.max_income_dollars)
+                    and (p.eligibility.asset_limit_dollars is None
+                         or 5_000 <= p.eligibility.asset_limit_dollars)
+                ]
+                assert screen(income, household_size, assets=5_000) == expected
+
+    def test_categorical_eligibility_skips_income_test(self):
+        income = get_fpl(2) * 3  # over every FPL-based limit
+        assert "wic" not in screen(income, 2, assets=50_000)
+        ids = screen(income, 2, assets=50_000, receiving=["ssi"])
+        # SSI → Medicaid → WIC / Extra Help / Lifeline chain through the edges
+        assert {"ssi", "medicaid", "wic", "extra_help", "lifeline"} <= set(ids)
+        assert "snap" not in ids
+
+    def test_flat_income_cap_applies(self):
+        assert "caleitc" in screen(25_000, 2)
+        assert "caleitc" not in screen(35_000, 2)
+
+    def test_asset_limit_excludes(self):
+        assert "snap" in screen(10_000, 3, assets=0)
+        assert "snap" not in screen(10_000, 3, assets=1_000_000)
+
+    def test_batch_matches_single(self):
+        incomes = [0, 20_000, 45_000, 90_000, 30_000]
+        sizes = [1, 4, 8, 11, 2]
+        assets = [0, 2_500, 5_000, 0, 100_000]
+        matrix = screen_batch(incomes, sizes, assets)
+        ids = [p.id for p in BENEFITS_PROGRAMS]
+        assert matrix.shape == (5, len(ids))
+        for row, args in zip(matrix, zip(incomes, sizes, assets)):
+            assert [pid for pid, ok in zip(ids, row) if ok] == screen(*args)
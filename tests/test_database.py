@@ -0,0 +1,201 @@
+"""
+Unit tests for backend/database.py — the SQLite-backed session store.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.database import SessionStore
+
+
+@pytest.fixture
+async def store(tmp_path):
+    s = SessionStore()
+    s._db_path = str(tmp_path / "sessions.db")
+    await s.init_db()
+    yield s
+    await s.close()
+
+
+async def _reopen(store: SessionStore) -> SessionStore:
+    """A fresh store on the same file, so reads come from SQLite, not the cache."""
+    fresh = SessionStore()
+    fresh._db_path = store._db_path
+    await fresh.init_db()
+    return fresh
+
+
+class TestSessionStore:
+    async def test_round_trip(self, store):
+        session = await store.get_or_create_session("s1")
+        session["messages"].append({"role": "user", "content": [{"text": "hi"}]})
+        session["user_profile"] = {"household_size": 3}
+        session["action_plan"] = {"total_steps": 2}
+        await store.save_session(session)
+        await store.flush()
+
+        fresh = await _reopen(store)
+        try:
+            loaded = await fresh.get_session("s1")
+        finally:
+            await fresh.close()
+        assert loaded["messages"] == [{"role": "user", "content": [{"text": "hi"}]}]
+        assert loaded["user_profile"] == {"household_size": 3}
+        assert loaded["action_plan"] == {"total_steps": 2}
+        assert loaded["document_analysis"] is None
+
+    async def test_repeated_saves_keep_one_copy_of_each_message(self, store):
+        session = await store.get_or_create_session("s2")
+        for i in range(3):
+            session["messages"].append({"role": "user", "content": [{"text": f"q{i}"}]})
+            await store.save_session(session)
+            await store.flush()
+
+        fresh = await _reopen(store)
+        try:
+            loaded = await fresh.get_session("s2")
+        finally:
+            await fresh.close()
+        assert [m["content"][0]["text"] for m in loaded["messages"]] == ["q0", "q1", "q2"]
+
+    async def test_in_place_field_change_persisted(self, store):
+        session = await store.get_or_create_session("s5")
+        session["user_profile"]["age"] = 40
+        await store.save_session(session)
+        await store.flush()
+        session["user_profile"]["age"] = 41  # mutated in place, as the tools do
+        await store.save_session(session)
+        await store.flush()
+
+        fresh = await _reopen(store)
+        try:
+            loaded = await fresh.get_session("s5")
+        finally:
+            await fresh.close()
+        assert loaded["user_profile"] == {"age": 41}
+
+    async def test_rewritten_message_replaces_stored_history(self, store):
+        session = await store.get_or_create_session("s4")
+        session["messages"].append({"role": "user", "content": [{"text": "[image]"}]})
+        await store.save_session(session)
+        await store.flush()
+        session["messages"][0]["content"] = [{"text": "[document analyzed]"}]
+        session["messages"].append({"role": "assistant", "content": [{"text": "done"}]})
+        await store.save_session(session)
+        await store.flush()
+
+        fresh = await _reopen(store)
+        try:
+            loaded = await fresh.get_session("s4")
+        finally:
+            await fresh.close()
+        assert [m["content"][0]["text"] for m in loaded["messages"]] == ["[document analyzed]", "done"]
+
+    async def test_cleared_session_not_reloaded(self, store):
+        session = await store.get_or_create_session("s3")
+        session["messages"].append({"role": "user", "content": [{"text": "hi"}]})
+        await store.save_session(session)
+        await store.flush()
+        await store.clear_session("s3")
+        async with store._db.execute("SELECT COUNT(*) FROM messages") as cursor:
+            assert (await cursor.fetchone())[0] == 0
+        fresh = await _reopen(store)
+        try:
+            assert await fresh.get_session("s3") is None
+        finally:
+            await fresh.close()
+
+    async def test_message_load_uses_index(self, store):
+        async with store._db.execute(
+            "EXPLAIN QUERY PLAN SELECT role, content FROM messages WHERE session_id = ? ORDER BY id",
+            ("s",),
+        ) as cursor:
+            plan = " ".join(row[-1] for row in await cursor.fetchall())
+        assert "ix_messages_session_id" in plan
+        assert "TEMP B-TREE" not in plan
+
+    async def test_saves_written_behind_in_one_flush(self, store):
+        for sid in ("a", "b"):
+            await store.save_session(await store.get_or_create_session(sid))
+        count = "SELECT COUNT(*) FROM sessions"
+        async with store._db.execute(count) as cursor:
+            assert (await cursor.fetchone())[0] == 0
+        await store.flush()
+        async with store._db.execute(count) as cursor:
+            assert (await cursor.fetchone())[0] == 2
+
+    async def test_loads_rows_stored_as_text(self, store):
+        await store._db.execute(
+            "INSERT INTO sessions (id, created_at, user_profile) VALUES ('old', '', '{\"age\": 70}')"
+        )
+        await store._db.execute(
+            "INSERT INTO messages (session_id, role, content, created_at)"
+            " VALUES ('old', 'user', '[{\"text\": \"hi\"}]', '')"
+        )
+        await store._db.commit()
+        loaded = await store.get_session("old")
+        assert loaded["user_profile"] == {"age": 70}
+        assert loaded["messages"] == [{"role": "user", "content": [{"text": "hi"}]}]
+
+    async def test_flush_writes_messages_as_of_save(self, store):
+        session = await store.get_or_create_session("s6")
+        session["messages"].append({"role": "user", "content": [{"text": "hi"}]})
+        session["messages"].append({"role": "assistant", "content": [{"text": "hello"}]})
+        await store.save_session(session)
+        # The next turn's transient tool messages, appended before the flush runs
+        session["messages"].append({"role": "user", "content": [{"text": "more"}]})
+        session["messages"].append({"role": "assistant", "content": [{"toolUse": {"name": "x"}}]})
+        await store.flush()
+
+        fresh = await _reopen(store)
+        try:
+            loaded = await fresh.get_session("s6")
+        finally:
+            await fresh.close()
+        assert [m["role"] for m in loaded["messages"]] == ["user", "assistant"]
+
+    async def test_failing_session_does_not_drop_batch(self, store):
+        bad = await store.get_or_create_session("bad")
+        bad["messages"].append({"role": "user", "content": [{"text": {1, 2}}]})  # not JSON
+        good = await store.get_or_create_session("good")
+        good["messages"].append({"role": "user", "content": [{"text": "hi"}]})
+        await store.save_session(bad)
+        await store.save_session(good)
+        await store.flush()
+        async with store._db.execute("SELECT id FROM sessions") as cursor:
+            assert [row[0] for row in await cursor.fetchall()] == ["good"]
+
+    async def test_failed_commit_keeps_batch_pending(self, store, monkeypatch):
+        session = await store.get_or_create_session("s7")
+        await store.save_session(session)
+        commit = store._db.commit
+
+        async def failing_commit():
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(store._db, "commit", failing_commit)
+        await store.flush()
+        assert "s7" in store._dirty
+        monkeypatch.setattr(store._db, "commit", commit)
+        await store.flush()
+        assert not store._dirty
+        async with store._db.execute("SELECT COUNT(*) FROM sessions") as cursor:
+            assert (await cursor.fetchone())[0] == 1
+
+    async def test_clear_during_flush_leaves_no_bookkeeping(self, store):
+        session = await store.get_or_create_session("s8")
+        session["messages"].append({"role": "user", "content": [{"text": "hi"}]})
+        await store.save_session(session)
+        flush = asyncio.create_task(store.flush())
+        await asyncio.sleep(0)  # the flush now holds the write lock
+        await store.clear_session("s8")
+        await flush
+        assert "s8" not in store._persisted_fields
+
+        session = await store.get_or_create_session("s8")
+        session["messages"].append({"role": "user", "content": [{"text": "again"}]})
+        await store.save_session(session)
+        await store.flush()
+        async with store._db.execute("SELECT content FROM messages") as cursor:
+            assert len(await cursor.fetchall()) == 1
@@ -0,0 +1,263 @@
+"""
+Unit tests for backend/agents/orchestrator.py.
+
+Bedrock is mocked at the boto3 client level — no AWS credentials needed.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.agents.orchestrator import CompassOrchestrator, _history_window_start
+
+
+@pytest.fixture
+def orchestrator():
+    with patch("boto3.client", return_value=MagicMock()):
+        yield CompassOrchestrator()
+
+
+def _tool_call(tool_use_id: str, name: str, tool_input: dict) -> dict:
+    return {"tool_use_id": tool_use_id, "name": name, "input": tool_input}
+
+
+ELIGIBILITY_INPUT = {
+    "annual_income": 15_000,
+    "household_size": 3,
+    "state": "CA",
+    "age": 30,
+    "employment_status": "unemployed",
+    "special_circumstances": [],
+}
+
+
+class TestExecuteToolCalls:
+    async def test_results_keep_call_order(self, orchestrator):
+        session = await orchestrator.get_or_create_session("s1")
+        made: list[dict] = []
+        results = await orchestrator._execute_tool_calls(
+            session,
+            [
+                _tool_call("t1", "check_benefit_eligibility", ELIGIBILITY_INPUT),
+                _tool_call("t2", "find_local_resources", {"zip_code": "94601", "needs_list": ["food"]}),
+            ],
+            made,
+        )
+        assert [r["toolResult"]["toolUseId"] for r in results] == ["t1", "t2"]
+        assert [m["name"] for m in made] == ["check_benefit_eligibility", "find_local_resources"]
+        assert session["eligible_programs"]
+        assert session["local_resources"]
+
+    async def test_failing_tool_reported_as_error(self, orchestrator):
+        session = await orchestrator.get_or_create_session("s2")
+        results = await orchestrator._execute_tool_calls(
+            session,
+            [
+                _tool_call("bad", "check_benefit_eligibility", {"household_size": 2}),
+                _tool_call("ok", "find_local_resources", {"zip_code": "94601", "needs_list": ["food"]}),
+            ],
+            [],
+        )
+        assert "error" in results[0]["toolResult"]["content"][0]["json"]
+        assert "error" not in results[1]["toolResult"]["content"][0]["json"]
+
+    async def test_analyzed_image_replaced_in_history(self, orchestrator):
+        orchestrator.nova_lite.client.converse.return_value = _bedrock_text(
+            '{"document_type_detected": "pay_stub", "key_fields": {}, "confidence": "low"}'
+        )
+        session = await orchestrator.get_or_create_session("s4")
+        session["messages"].append({
+            "role": "user",
+            "content": [
+                {"image": {"format": "jpeg", "source": {"bytes": "aGVsbG8="}}},
+                {"text": "Here is my pay stub"},
+            ],
+        })
+        await orchestrator._execute_tool_calls(
+            session,
+            [_tool_call("d1", "analyze_document", {"image_base64": "aGVsbG8=", "document_type": "pay_stub"})],
+            [],
+        )
+        assert session["messages"][-1]["content"] == [
+            {"text": "[document analyzed: pay_stub]"},
+            {"text": "Here is my pay stub"},
+        ]
+
+    async def test_profile_updates_applied_in_call_order(self, orchestrator):
+        orchestrator.nova_lite.client.converse.return_value = _bedrock_text(
+            '{"document_type_detected": "pay_stub", "key_fields": {}, "confidence": "high",'
+            ' "annual_income_estimate": 52000}'
+        )
+        session = await orchestrator.get_or_create_session("s5")
+        await orchestrator._execute_tool_calls(
+            session,
+            [
+                _tool_call("d1", "analyze_document", {"image_base64": "aGVsbG8=", "document_type": "pay_stub"}),
+                _tool_call("e1", "check_benefit_eligibility", ELIGIBILITY_INPUT),
+            ],
+            [],
+        )
+        assert session["user_profile"]["annual_income"] == ELIGIBILITY_INPUT["annual_income"]
+
+    async def test_unknown_tool(self, orchestrator):
+        session = await orchestrator.get_or_create_session("s3")
+        results = await orchestrator._execute_tool_calls(
+            session, [_tool_call("x", "no_such_tool", {})], []
+        )
+        assert results[0]["toolResult"]["content"][0]["json"] == {"error": "Unknown tool: no_such_tool"}
+
+
+class TestInMemorySessions:
+    async def test_least_recently_used_evicted(self, orchestrator, monkeypatch):
+        monkeypatch.setattr("backend.agents.orchestrator.SESSION_CACHE_SIZE", 2)
+        await orchestrator.get_or_create_session("a")
+        await orchestrator.get_or_create_session("b")
+        await orchestrator.get_session("a")
+        await orchestrator.get_or_create_session("c")
+        assert await orchestrator.get_session("b") is None
+        assert await orchestrator.get_session("a") is not None
+
+    async def test_expired_session_dropped(self, orchestrator, monkeypatch):
+        monkeypatch.setattr("backend.agents.orchestrator.SESSION_TTL_SECONDS", -1)
+        await orchestrator.get_or_create_session("a")
+        assert await orchestrator.get_session("a") is None
+
+    async def test_expired_sessions_pruned_on_insert(self, orchestrator, monkeypatch):
+        await orchestrator.get_or_create_session("a")
+        monkeypatch.setattr("backend.agents.orchestrator.SESSION_TTL_SECONDS", -1)
+        await orchestrator.get_or_create_session("b")
+        assert list(orchestrator._sessions) == ["b"]
+
+
+def _bedrock_text(text: str) -> dict:
+    return {
+        "stopReason": "end_turn",
+        "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+    }
+
+
+def _bedrock_tool_use(tool_use_id: str, name: str, tool_input: dict) -> dict:
+    return {
+        "stopReason": "tool_use",
+        "output": {
+            "message": {
+                "role": "assistant",
+                "content": [{"toolUse": {"toolUseId": tool_use_id, "name": name, "input": tool_input}}],
+            }
+        },
+    }
+
+
+class TestChat:
+    async def test_tool_turn_then_answer(self, orchestrator):
+        orchestrator.nova_lite.client.converse.side_effect = [
+            _bedrock_tool_use("t1", "check_benefit_eligibility", ELIGIBILITY_INPUT),
+            _bedrock_text("<thinking>plan</thinking>You likely qualify for SNAP."),
+        ]
+        result = await orchestrator.chat("chat1", "I need help with groceries")
+        assert result["response"] == "You likely qualify for SNAP."
+        assert [t["name"] for t in result["tool_calls_made"]] == ["check_benefit_eligibility"]
+        assert result["session_data"]["has_results"] is True
+
+        # Intermediate tool turns are not kept in the session history
+        session = await orchestrator.get_session("chat1")
+        assert [m["role"] for m in session["messages"]] == ["user", "assistant"]
+
+    async def test_session_saved_once_per_turn(self, orchestrator):
+        orchestrator.store = MagicMock()
+        orchestrator.store.get_cached.return_value = None
+        orchestrator.store.get_or_create_session = AsyncMock(return_value={
+            "session_id": "chat3", "messages": [], "eligible_programs": [],
+            "local_resources": [], "action_plan": None, "document_analysis": None,
+            "user_profile": {},
+        })
+        orchestrator.store.save_session = AsyncMock()
+        orchestrator.nova_lite.client.converse.return_value = _bedrock_text("Hi there.")
+
+        await orchestrator.chat("chat3", "hello")
+
+        orchestrator.store.save_session.assert_awaited_once()
+        saved = orchestrator.store.save_session.await_args.args[0]
+        assert [m["role"] for m in saved["messages"]] == ["user", "assistant"]
+
+    async def test_concurrent_turns_on_one_session_serialized(self, orchestrator):
+        orchestrator.nova_lite.client.converse.side_effect = [
+            _bedrock_tool_use("t1", "check_benefit_eligibility", ELIGIBILITY_INPUT),
+            _bedrock_text("first"),
+            _bedrock_tool_use("t2", "check_benefit_eligibility", ELIGIBILITY_INPUT),
+            _bedrock_text("second"),
+        ]
+        await asyncio.gather(
+            orchestrator.chat("chat4", "one"),
+            orchestrator.chat("chat4", "two"),
+        )
+        session = await orchestrator.get_session("chat4")
+        assert [m["content"][0]["text"] for m in session["messages"]] == ["one", "first", "two", "second"]
+
+    async def test_history_rolled_back_on_error(self, orchestrator):
+        orchestrator.nova_lite.client.converse.side_effect = [
+            _bedrock_tool_use("t1", "check_benefit_eligibility", ELIGIBILITY_INPUT),
+            RuntimeError("bedrock down"),
+        ]
+        with pytest.raises(RuntimeError):
+            await orchestrator.chat("chat2", "hello")
+        session = await orchestrator.get_session("chat2")
+        assert [m["role"] for m in session["messages"]] == ["user"]
+
+
+def _bedrock_stream(*deltas: str) -> dict:
+    events = [{"contentBlockStart": {"start": {"text": ""}}}]
+    events += [{"contentBlockDelta": {"delta": {"text": d}}} for d in deltas]
+    events += [{"contentBlockStop": {}}, {"messageStop": {"stopReason": "end_turn"}}]
+    return {"stream": events}
+
+
+async def _collect_sse(stream) -> list[dict]:
+    events = []
+    async for frame in stream:
+        assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+        events.append(json.loads(frame[len(b"data: "):]))
+    return events
+
+
+class TestChatStream:
+    async def test_deltas_then_done(self, orchestrator):
+        orchestrator.nova_lite.client.converse_stream.return_value = _bedrock_stream(
+            "Hello", ", \"friend\"", " — welcome!"
+        )
+        events = await _collect_sse(orchestrator.chat_stream("st1", "hi"))
+        text = "".join(e["delta"] for e in events if "delta" in e)
+        assert text == 'Hello, "friend" — welcome!'
+        done = events[-1]
+        assert done["done"] is True
+        assert done["response"] == text
+        assert done["session_id"] == "st1"
+
+    async def test_deltas_coalesced_after_first(self, orchestrator, monkeypatch):
+        monkeypatch.setattr("backend.agents.orchestrator.STREAM_N", 4)
+        orchestrator.nova_lite.client.converse_stream.return_value = _bedrock_stream(
+            *[str(i) for i in range(10)]
+        )
+        events = await _collect_sse(orchestrator.chat_stream("st2", "hi"))
+        deltas = [e["delta"] for e in events if "delta" in e]
+        assert deltas == ["0", "1234", "5678", "9"]
+
+
+class TestHistoryWindow:
+    def test_short_history_sent_whole(self):
+        messages = [{"role": "user", "content": [{"text": "hi"}]}]
+        assert _history_window_start(messages) == 0
+
+    def test_long_history_trimmed_to_user_boundary(self, monkeypatch):
+        monkeypatch.setattr("backend.agents.orchestrator.NOVA_LITE_MAX_HISTORY_TURNS", 2)
+        messages = []
+        for i in range(5):
+            messages.append({"role": "user", "content": [{"text": f"q{i}"}]})
+            messages.append({"role": "assistant", "content": [{"text": f"a{i}"}]})
+        messages.append({"role": "user", "content": [{"text": "q5"}]})
+        start = _history_window_start(messages)
+        # 11 messages, window of 4 → starts at index 7 (an assistant reply), snaps to 8
+        assert start == 8
+        assert messages[start]["content"][0]["text"] == "q4"